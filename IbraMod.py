@@ -10,7 +10,17 @@ import zipfile
 import shutil
 import platform
 import time
+import re
+import math
+import random
+import hashlib
+import uuid
+import base64
+import urllib.parse
+import http.server
+import xml.etree.ElementTree as ET
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed, Future
 from tkinter import messagebox, filedialog
 from PIL import Image
 
@@ -40,20 +50,202 @@ BASE_DIR = ROOT_DIR / "instances"
 CACHE_FILE = ROOT_DIR / "name_cache.json"
 SETTINGS_FILE = ROOT_DIR / "settings.json"
 TEMP_DIR = ROOT_DIR / "temp"
+MANIFEST_DIR = ROOT_DIR / "manifests"   # Cached Mojang/Forge/Fabric manifests
+ARTIFACT_DIR = ROOT_DIR / "artifacts"   # Local store of versions/libraries/assets for offline installs
+LAN_CACHE_DIR = ROOT_DIR / "lan_cache"  # Files served to other machines when running as LAN cache
+LOCKFILE_FORMAT = 1
 
 # Define the Icon Path here so i can use it later
 ICON_FILE = ASSET_DIR / "app_icon.ico"
 ICON_PNG = ASSET_DIR / "app_icon.png"
 
-# Create folders if they don't exist
-if not BASE_DIR.exists(): BASE_DIR.mkdir(parents=True)
-if not TEMP_DIR.exists(): TEMP_DIR.mkdir(parents=True)
-
 # --- Modrinth API Client ---
+class ModrinthError(Exception):
+    """Base for Modrinth failures. The message is meant to be shown to the user as-is."""
+
+class ModrinthRateLimited(ModrinthError):
+    def __init__(self, retry_after):
+        super().__init__(f"Modrinth is rate limiting us, try again in {int(retry_after) + 1}s.")
+        self.retry_after = retry_after
+
+class ModrinthTimeout(ModrinthError): pass
+
+class ModrinthUnavailable(ModrinthError): pass     # Connection problems and 5xx
+
+class ModrinthHTTPError(ModrinthError):
+    def __init__(self, status, text=""):
+        super().__init__(f"Modrinth rejected the request (HTTP {status}). {text[:200]}".strip())
+        self.status = status
+
+class RateGovernor:
+    """Token bucket sized from Modrinth's X-Ratelimit-* headers plus an AIMD cap on
+    in-flight requests: halves on a 429, grows by one after a window of successful responses."""
+    def __init__(self, limit=300, window=60.0, max_concurrency=8):
+        self.cond = threading.Condition()
+        self.limit = limit
+        self.window = window
+        self.tokens = float(limit)
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.max_concurrency = max_concurrency
+        self.concurrency = max(1, max_concurrency // 2)
+        self.in_flight = 0
+        self.successes = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.limit, self.tokens + (now - self.last_refill) * self.limit / self.window)
+        self.last_refill = now
+
+    def acquire(self):
+        """Blocks until a request may be sent. Returns how long it waited, in seconds."""
+        start = time.monotonic()
+        with self.cond:
+            while True:
+                self._refill()
+                now = time.monotonic()
+                if now < self.blocked_until: wait = self.blocked_until - now
+                elif self.in_flight >= self.concurrency: wait = None     # woken by release()
+                elif self.tokens < 1: wait = (1 - self.tokens) * self.window / self.limit
+                else:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return time.monotonic() - start
+                self.cond.wait(wait)
+
+    def release(self, headers=None, throttled=False, retry_after=None, ok=False):
+        with self.cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            try:
+                if headers and "X-Ratelimit-Limit" in headers:
+                    self.limit = max(1, int(headers["X-Ratelimit-Limit"]))
+                    remaining = int(headers.get("X-Ratelimit-Remaining", self.limit))
+                    # The server knows better than our bucket how much is left in this window
+                    self.tokens = min(self.tokens, remaining)
+                    if remaining <= 0: self.blocked_until = max(self.blocked_until, now + float(headers.get("X-Ratelimit-Reset", 1)))
+            except ValueError: pass
+            if throttled:
+                self.concurrency = max(1, self.concurrency // 2)
+                self.successes = 0
+                self.blocked_until = max(self.blocked_until, now + (retry_after or 1))
+            elif not ok:
+                # Timeouts, dropped connections and error statuses say nothing good about our pace, don't grow on them
+                self.successes = 0
+            else:
+                self.successes += 1
+                if self.successes >= self.concurrency * 4 and self.concurrency < self.max_concurrency:
+                    self.concurrency += 1
+                    self.successes = 0
+            self.cond.notify_all()
+
 class Modrinth:
     BASE = "https://api.modrinth.com/v2"
     HEADERS = {"User-Agent": "IbraMod-Launcher/3.0"}
+    TIMEOUT = (5, 20)           # connect, read
+    MAX_RETRIES = 4
+    BACKOFF_BASE = 0.5
+    BACKOFF_CAP = 30.0
+    LATENCY_BUCKETS = [50, 100, 250, 500, 1000, 2500, 5000]    # ms, plus one overflow bucket
 
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.headers.update(self.HEADERS)
+        self.governor = RateGovernor()
+        self.lock = threading.Lock()
+        self.pending = {}       # request key -> Future shared by identical in-flight calls
+        self.stats = {"requests": 0, "ok": 0, "failed": 0, "retries": 0, "throttled": 0, "coalesced": 0,
+                      "queued_s": 0.0, "status": {}, "latency_ms": [0] * (len(self.LATENCY_BUCKETS) + 1)}
+
+    # --- HTTP governor ---
+    def _request(self, method, path, params=None, body=None):
+        """Sends one API call, or joins an identical call that is already in flight.
+        Returns parsed JSON, None for 404, and raises ModrinthError for everything else."""
+        key = (method, path, json.dumps(params, sort_keys=True), json.dumps(body, sort_keys=True))
+        with self.lock:
+            fut = self.pending.get(key)
+            leader = fut is None
+            if leader: fut = self.pending[key] = Future()
+            else: self.stats["coalesced"] += 1
+        if not leader: return fut.result()
+        try:
+            result = self._send(method, path, params, body)
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self.lock: self.pending.pop(key, None)
+
+    def _send(self, method, path, params, body):
+        error = None
+        for attempt in range(self.MAX_RETRIES + 1):
+            if attempt:
+                # Jittered exponential backoff, but never earlier than the server asked for
+                delay = min(self.BACKOFF_CAP, self.BACKOFF_BASE * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                if isinstance(error, ModrinthRateLimited): delay = max(delay, error.retry_after)
+                with self.lock: self.stats["retries"] += 1
+                time.sleep(delay)
+
+            queued = self.governor.acquire()
+            start = time.monotonic()
+            resp, retry_after = None, None
+            try:
+                resp = self.session.request(method, f"{self.BASE}{path}", params=params, json=body, timeout=self.TIMEOUT)
+                if resp.status_code == 429:
+                    try: retry_after = float(resp.headers.get("Retry-After") or resp.headers.get("X-Ratelimit-Reset") or 1)
+                    except ValueError: retry_after = 1.0
+            except requests.Timeout:
+                error = ModrinthTimeout("Modrinth took too long to respond.")
+            except requests.RequestException as e:
+                error = ModrinthUnavailable(f"Could not reach Modrinth ({e.__class__.__name__}).")
+            finally:
+                self.governor.release(resp.headers if resp is not None else None, retry_after is not None, retry_after,
+                                      ok=resp is not None and resp.ok)
+                self._record(resp, time.monotonic() - start, queued)
+
+            if resp is None: continue
+            if resp.status_code == 404: return None
+            if resp.ok:
+                try: return resp.json()
+                except ValueError: raise ModrinthUnavailable("Modrinth sent a response we could not read.")
+            if resp.status_code == 429: error = ModrinthRateLimited(retry_after)
+            elif resp.status_code >= 500: error = ModrinthUnavailable(f"Modrinth is having problems (HTTP {resp.status_code}).")
+            else: raise ModrinthHTTPError(resp.status_code, resp.text)
+        raise error
+
+    def _record(self, resp, elapsed, queued):
+        ms = elapsed * 1000
+        bucket = next((i for i, b in enumerate(self.LATENCY_BUCKETS) if ms <= b), len(self.LATENCY_BUCKETS))
+        status = str(resp.status_code) if resp is not None else "error"
+        with self.lock:
+            s = self.stats
+            s["requests"] += 1
+            s["queued_s"] += queued
+            s["latency_ms"][bucket] += 1
+            s["status"][status] = s["status"].get(status, 0) + 1
+            if resp is not None and (resp.ok or resp.status_code == 404): s["ok"] += 1
+            else: s["failed"] += 1
+            if status == "429": s["throttled"] += 1
+
+    def get_stats(self):
+        with self.lock: snap = json.loads(json.dumps(self.stats))
+        labels = [f"<={b}ms" for b in self.LATENCY_BUCKETS] + [f">{self.LATENCY_BUCKETS[-1]}ms"]
+        snap["latency_ms"] = dict(zip(labels, snap["latency_ms"]))
+        with self.governor.cond:
+            snap["concurrency"] = self.governor.concurrency
+            snap["rate_limit"] = self.governor.limit
+        return snap
+
+    def stats_summary(self):
+        s = self.get_stats()
+        busiest = max(s["latency_ms"].items(), key=lambda kv: kv[1])[0] if s["requests"] else "-"
+        return (f"Modrinth: {s['requests']} requests, {s['failed']} failed, {s['retries']} retries, "
+                f"{s['throttled']} throttled, {s['coalesced']} shared\n"
+                f"Most requests {busiest}, concurrency {s['concurrency']}, limit {s['rate_limit']}/min")
+
+    # --- API ---
     def search(self, query="", index="relevance", facet_type="mod", version=None, loader=None):
         if not query: return []
         facets_list = [[f"project_type:{facet_type}"]]
@@ -65,31 +257,855 @@ class Modrinth:
             if l in ["forge", "fabric", "neoforge"]:
                 facets_list.append([f"categories:{l}"])
         params = {'query': query, 'limit': 20, 'index': index, 'facets': json.dumps(facets_list)}
-        try: 
-            resp = requests.get(f"{self.BASE}/search", params=params, headers=self.HEADERS)
-            return resp.json().get('hits', [])
-        except: return []
+        return (self._request("GET", "/search", params=params) or {}).get('hits', [])
 
     def get_latest_version_file(self, project_id, loaders, game_versions=None):
-        params = {'loaders': str(loaders).replace("'", '"')}
-        if game_versions: params['game_versions'] = str(game_versions).replace("'", '"')
+        params = {'loaders': json.dumps(loaders)}
+        if game_versions: params['game_versions'] = json.dumps(game_versions)
+        data = self._request("GET", f"/project/{project_id}/version", params=params)
+        return data[0]['files'][0] if data else None
+
+    def get_project_versions(self, project_id):
+        return self._request("GET", f"/project/{project_id}/version") or []
+
+    def get_versions_from_hashes(self, hashes, algorithm="sha1"):
+        # Returns {hash: version} for every file Modrinth knows about
+        if not hashes: return {}
+        return self._request("POST", "/version_files", body={"hashes": hashes, "algorithm": algorithm}) or {}
+
+# --- Manifest Service (cached Mojang / Forge / Fabric metadata) ---
+class ManifestService:
+    # key: (url, ttl in seconds)
+    SOURCES = {
+        "mojang": ("https://piston-meta.mojang.com/mc/game/version_manifest_v2.json", 3600),
+        "forge": ("https://maven.minecraftforge.net/net/minecraftforge/forge/maven-metadata.xml", 6 * 3600),
+        "fabric_loader": ("https://meta.fabricmc.net/v2/versions/loader", 6 * 3600),
+        "fabric_game": ("https://meta.fabricmc.net/v2/versions/game", 6 * 3600),
+    }
+
+    def __init__(self, offline=False):
+        self.offline = offline
+        self.lock = threading.Lock()
+        self.docs = {}          # key -> {"fetched": ts, "data": ...}
+        self.index = {}         # key -> lookup tables built from the doc
+        self.refreshing = {}    # key -> Event set when that refresh finishes
+        self.listeners = []     # called with the key whenever a doc gets refreshed
+
+    def on_update(self, fn):
+        with self.lock: self.listeners.append(fn)
+
+    def remove_listener(self, fn):
+        with self.lock:
+            if fn in self.listeners: self.listeners.remove(fn)
+
+    def _path(self, key): return MANIFEST_DIR / f"{key}.json"
+
+    def _load_disk(self, key):
+        try: return json.loads(self._path(key).read_text())
+        except: return None
+
+    def _fetch(self, key):
+        url = self.SOURCES[key][0]
+        resp = requests.get(url, timeout=(5, 30))
+        resp.raise_for_status()
+        if key == "forge":
+            # Only the version list is useful, so don't bother caching the raw XML
+            data = [v.text for v in ET.fromstring(resp.content).iter("version") if v.text]
+        else:
+            data = resp.json()
+        doc = {"fetched": time.time(), "data": data}
+        tmp = self._path(key).with_suffix(".tmp")
+        tmp.write_text(json.dumps(doc))
+        os.replace(tmp, self._path(key))
+        return doc
+
+    def _set(self, key, doc):
+        with self.lock:
+            self.docs[key] = doc
+            self.index[key] = self._build_index(key, doc["data"])
+            listeners = list(self.listeners)
+        for fn in listeners:
+            try: fn(key)
+            except Exception as e: print(f"Manifest listener failed: {e}")
+
+    def _build_index(self, key, data):
+        if key == "mojang":
+            return {
+                "latest": data.get("latest", {}),
+                "releases": [v["id"] for v in data.get("versions", []) if v.get("type") == "release"],
+                "all": {v["id"]: v for v in data.get("versions", [])},
+            }
+        if key == "forge":
+            by_mc = {}
+            for full in data:
+                by_mc.setdefault(full.split("-")[0], []).append(full)
+            return {"by_mc": by_mc}
+        if key == "fabric_loader":
+            return {"all": [l["version"] for l in data], "stable": [l["version"] for l in data if l.get("stable")]}
+        if key == "fabric_game":
+            return {"supported": {g["version"] for g in data}}
+        return {}
+
+    def _stale(self, key, doc):
+        return time.time() - doc.get("fetched", 0) > self.SOURCES[key][1]
+
+    def refresh(self, key, background=True):
+        """Re-fetches key. In the foreground this also waits for a refresh that is already running."""
+        if self.offline: return
+        with self.lock:
+            running = self.refreshing.get(key)
+            if not running: done = self.refreshing[key] = threading.Event()
+        if running:
+            if not background: running.wait()
+            return
+        def run():
+            try: self._set(key, self._fetch(key))
+            except Exception as e: print(f"Manifest refresh failed ({key}): {e}")
+            finally:
+                with self.lock: self.refreshing.pop(key, None)
+                done.set()
+        if background: threading.Thread(target=run, daemon=True).start()
+        else: run()
+
+    def refresh_all(self, force=False):
+        for key in self.SOURCES:
+            doc = self.docs.get(key) or self._load_disk(key)
+            if force or not doc or self._stale(key, doc): self.refresh(key)
+
+    def get(self, key, block=True):
+        """Returns the index for key. Serves from memory/disk right away and
+        refreshes stale docs in the background. Only blocks when nothing is
+        cached (and block is True)."""
+        with self.lock:
+            idx = self.index.get(key)
+            doc = self.docs.get(key)
+        if idx is None:
+            doc = self._load_disk(key)
+            if doc:
+                self._set(key, doc)
+            elif not self.offline:
+                self.refresh(key, background=not block)
+            with self.lock: idx = self.index.get(key)
+        if doc and self._stale(key, doc): self.refresh(key)
+        return idx or {}
+
+    # --- Lookups ---
+    def mc_versions(self, block=True):
+        return list(self.get("mojang", block).get("releases", []))
+
+    def latest_release(self):
+        return self.get("mojang").get("latest", {}).get("release")
+
+    def version_entry(self, version_id):
+        return self.get("mojang").get("all", {}).get(version_id)
+
+    def forge_builds(self, mc_version):
+        """All Forge builds for a game version, newest first (maven order)."""
+        return list(self.get("forge").get("by_mc", {}).get(mc_version, []))
+
+    def latest_forge(self, mc_version):
+        builds = self.forge_builds(mc_version)
+        return builds[0] if builds else None
+
+    def fabric_loaders(self, stable_only=True):
+        return list(self.get("fabric_loader").get("stable" if stable_only else "all", []))
+
+    def latest_fabric_loader(self):
+        loaders = self.fabric_loaders() or self.fabric_loaders(stable_only=False)
+        return loaders[0] if loaders else None
+
+    def fabric_supports(self, mc_version):
+        supported = self.get("fabric_game").get("supported")
+        return True if supported is None else mc_version in supported
+
+# --- Local Artifact Store (offline installs) ---
+def file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""): h.update(chunk)
+    return h.hexdigest()
+
+def link_or_copy(src, dst):
+    # Hardlinks are free on the same drive, fall back to a real copy otherwise
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try: os.link(src, dst)
+    except OSError: shutil.copy2(src, dst)
+
+class ArtifactStore:
+    SUBDIRS = ["versions", "libraries", "assets", "runtime"]
+    EXTRAS_FILE = "ibramod-extra-files.json"
+
+    def __init__(self, engine, root=ARTIFACT_DIR):
+        self.engine = engine  # InstallEngine, used to work out which files a version needs
+        self.root = Path(root)
+
+    def has_version(self, version_id):
+        return (self.root / "versions" / version_id / f"{version_id}.json").exists()
+
+    def find_versions(self, pattern):
+        d = self.root / "versions"
+        if not d.exists(): return []
+        return sorted([p.name for p in d.glob(pattern) if p.is_dir()], reverse=True)
+
+    def _copy(self, src, dst):
+        if dst.exists() or dst.is_symlink(): return
+        if src.is_symlink():
+            # Java runtimes on Linux/macOS ship relative symlinks, keep them as links
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            os.symlink(os.readlink(src), dst)
+        else: link_or_copy(src, dst)
+
+    def _files(self, root):
+        for sub in self.SUBDIRS:
+            d = root / sub
+            if not d.exists(): continue
+            for f in d.rglob("*"):
+                if f.is_file() or f.is_symlink(): yield f.relative_to(root)
+
+    def _chain(self, root, version_id):
+        ids = []
+        while version_id and version_id not in ids:
+            ids.append(version_id)
+            path = root / "versions" / version_id / f"{version_id}.json"
+            if not path.exists(): break
+            version_id = json.loads(path.read_text(encoding="utf-8")).get("inheritsFrom")
+        return ids
+
+    def _needed(self, root, version_id):
+        """Relative paths of every file version_id needs, read from the version JSONs under root."""
+        data = self.engine._resolve(root, version_id)
+        jobs, _ = self.engine.plan(data, root)
+        # versions/ is taken whole per id below; Forge ids have no client jar of their own even though plan() names one
+        needed = {j["path"].relative_to(root) for j in jobs if j["path"].relative_to(root).parts[0] != "versions"}
+        # Installer-built libraries (Forge) carry a path but no url, plan() skips those
+        for lib in data.get("libraries", []):
+            artifact = lib.get("downloads", {}).get("artifact") or {}
+            if artifact.get("path") and self.engine._allowed(lib): needed.add(Path("libraries") / artifact["path"])
+        for vid in self._chain(root, version_id):
+            vdir = root / "versions" / vid
+            if vdir.exists(): needed.update(f.relative_to(root) for f in vdir.rglob("*") if f.is_file())
+            extras = vdir / self.EXTRAS_FILE
+            if extras.exists(): needed.update(Path(p) for p in json.loads(extras.read_text(encoding="utf-8")))
+        if data.get("assetIndex"): needed.add(Path("assets") / "indexes" / f"{data['assets']}.json")
+        component = data.get("javaVersion", {}).get("component")
+        runtime = root / "runtime" / component if component else None
+        if runtime and runtime.exists(): needed.update(f.relative_to(root) for f in runtime.rglob("*") if f.is_file() or f.is_symlink())
+        return needed
+
+    def store(self, mc_dir):
+        """Copies whatever an online install just downloaded into the store."""
+        mc_dir = Path(mc_dir)
+        for rel in self._files(mc_dir): self._copy(mc_dir / rel, self.root / rel)
+
+        # Forge's installer writes patched jars that no version JSON mentions. The instance
+        # is fresh, so anything under libraries/ the JSONs don't explain came from it.
+        versions = mc_dir / "versions"
+        ids = [d.name for d in versions.iterdir() if (d / f"{d.name}.json").exists()] if versions.exists() else []
+        parents = {p for vid in ids for p in self._chain(mc_dir, vid)[1:]}
+        for vid in ids:
+            if vid in parents: continue
+            extras = {rel for rel in self._files(mc_dir) if rel.parts[0] == "libraries"} - self._needed(mc_dir, vid)
+            if extras: (self.root / "versions" / vid / self.EXTRAS_FILE).write_text(json.dumps(sorted(p.as_posix() for p in extras)), encoding="utf-8")
+
+    def restore(self, mc_dir, version_ids):
+        """Fills an instance with only the files version_ids need. They must already be in the store."""
+        missing = [v for v in version_ids if not self.has_version(v)]
+        if missing: raise ValueError(f"Not in local artifact store: {', '.join(missing)}")
+        needed = set()
+        for vid in version_ids: needed |= self._needed(self.root, vid)
+        absent = [rel for rel in needed if not ((self.root / rel).exists() or (self.root / rel).is_symlink())]
+        if absent: raise ValueError(f"Local artifact store is missing {len(absent)} files (e.g. {absent[0].as_posix()})")
+        mc_dir = Path(mc_dir)
+        for rel in needed: self._copy(self.root / rel, mc_dir / rel)
+
+# --- Install Engine (concurrent vanilla/Fabric installs) ---
+class InstallEngine:
+    LIBRARIES_URL = "https://libraries.minecraft.net"
+    RESOURCES_URL = "https://resources.download.minecraft.net"
+    FABRIC_PROFILE_URL = "https://meta.fabricmc.net/v2/versions/loader/{mc}/{loader}/profile/json"
+    FORGE_INSTALLER_URL = "https://maven.minecraftforge.net/net/minecraftforge/forge/{version}/forge-{version}-installer.jar"
+
+    def __init__(self, manifests, max_workers=16):
+        self.manifests = manifests
+        self.max_workers = max_workers
+        # One pooled session so the workers reuse connections instead of handshaking per file
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max_workers, max_retries=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"User-Agent": "IbraMod-Launcher/3.0"})
+        self.os_name = {"Windows": "windows", "Darwin": "osx"}.get(platform.system(), "linux")
+        self.arch = "32" if platform.architecture()[0] == "32bit" else "64"
+        self.mirror = None      # LAN cache base url, e.g. http://192.168.1.5:25585
+
+    # --- Version JSON ---
+    def _version_json_path(self, mc_dir, version_id):
+        return Path(mc_dir) / "versions" / version_id / f"{version_id}.json"
+
+    def _load_version_json(self, mc_dir, version_id):
+        path = self._version_json_path(mc_dir, version_id)
+        if not path.exists():
+            entry = self.manifests.version_entry(version_id)
+            if not entry: raise ValueError(f"Minecraft version {version_id} not found")
+            self._download({"url": entry["url"], "path": path, "sha1": entry.get("sha1")})
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _resolve(self, mc_dir, version_id):
+        # Same merge rules as mclib: child libraries win, everything else falls back to the parent
+        data = self._load_version_json(mc_dir, version_id)
+        if "inheritsFrom" not in data: return data
+        parent = self._resolve(mc_dir, data["inheritsFrom"])
+        child_libs = {self._lib_key(l) for l in data.get("libraries", [])}
+        merged = dict(parent)
+        merged.update({k: v for k, v in data.items() if k not in ("libraries", "inheritsFrom")})
+        merged["libraries"] = data.get("libraries", []) + [l for l in parent.get("libraries", []) if self._lib_key(l) not in child_libs]
+        return merged
+
+    def _lib_key(self, lib):
+        # group:artifact (+ classifier) without the version
+        parts = lib.get("name", "").split(":")
+        return ":".join(parts[:2] + parts[3:])
+
+    # --- Rules ---
+    def _rule_allows(self, rule):
+        ok = rule.get("action") == "allow"
+        os_rule = rule.get("os", {})
+        if "name" in os_rule and os_rule["name"] != self.os_name: return not ok
+        if os_rule.get("arch") == "x86" and self.arch != "32": return not ok
+        if rule.get("features"): return not ok
+        return ok
+
+    def _allowed(self, lib):
+        return all(self._rule_allows(r) for r in lib.get("rules", []))
+
+    # --- Planning ---
+    def _maven_path(self, name):
+        group, artifact, version, *rest = name.split(":")
+        ext = "jar"
+        if "@" in version: version, ext = version.split("@")
+        classifier = f"-{rest[0]}" if rest else ""
+        return f"{group.replace('.', '/')}/{artifact}/{version}/{artifact}-{version}{classifier}.{ext}"
+
+    def plan(self, data, mc_dir):
+        """Returns (downloads, natives) for a resolved version JSON. Each download
+        is a dict with url/path/sha1/size, natives are (jar path, exclude list)."""
+        mc_dir = Path(mc_dir)
+        jobs, natives = {}, []
+        def add(url, path, sha1=None, size=None):
+            jobs[str(path)] = {"url": url, "path": Path(path), "sha1": sha1, "size": size}
+
+        for lib in data.get("libraries", []):
+            if not self._allowed(lib) or "name" not in lib: continue
+            downloads = lib.get("downloads", {})
+            artifact = downloads.get("artifact")
+            if artifact and artifact.get("url") and artifact.get("path"):
+                add(artifact["url"], mc_dir / "libraries" / artifact["path"], artifact.get("sha1"), artifact.get("size"))
+            elif not downloads:
+                # Fabric/old-Forge style entries only carry a maven name and repo url
+                rel = self._maven_path(lib["name"])
+                add(f"{lib.get('url', self.LIBRARIES_URL).rstrip('/')}/{rel}", mc_dir / "libraries" / rel, lib.get("sha1"), lib.get("size"))
+            native = lib.get("natives", {}).get(self.os_name)
+            if native:
+                native = native.replace("${arch}", self.arch)
+                info = downloads.get("classifiers", {}).get(native)
+                if info:
+                    path = mc_dir / "libraries" / info["path"]
+                    add(info["url"], path, info.get("sha1"), info.get("size"))
+                    natives.append((path, lib.get("extract", {}).get("exclude", [])))
+
+        client = data.get("downloads", {}).get("client")
+        if client:
+            # Same lookup mclib does for -cp at launch: an explicit "jar" wins, otherwise the version's own id
+            jar_id = data.get("jar", data["id"])
+            add(client["url"], mc_dir / "versions" / jar_id / f"{jar_id}.jar", client.get("sha1"), client.get("size"))
+
+        logging_cfg = data.get("logging", {}).get("client", {}).get("file")
+        if logging_cfg:
+            add(logging_cfg["url"], mc_dir / "assets" / "log_configs" / logging_cfg["id"], logging_cfg.get("sha1"), logging_cfg.get("size"))
+
+        index = data.get("assetIndex")
+        if index:
+            index_path = mc_dir / "assets" / "indexes" / f"{data['assets']}.json"
+            if not self._is_valid({"path": index_path, "sha1": index.get("sha1")}):
+                self._download({"url": index["url"], "path": index_path, "sha1": index.get("sha1")})
+            objects = json.loads(index_path.read_text()).get("objects", {})
+            for obj in objects.values():
+                h = obj["hash"]
+                add(f"{self.RESOURCES_URL}/{h[:2]}/{h}", mc_dir / "assets" / "objects" / h[:2] / h, h, obj.get("size"))
+
+        return list(jobs.values()), natives
+
+    # --- Downloading ---
+    def _is_valid(self, job):
+        p = job["path"]
+        if not p.is_file(): return False
+        if job.get("size") is not None and p.stat().st_size != job["size"]: return False
+        return not job.get("sha1") or file_sha1(p) == job["sha1"]
+
+    def mirror_url(self, url, sha1=None):
+        # http://lan-host:port/https/libraries.minecraft.net/...?_sha1=... (see LanCacheServer)
+        if not self.mirror: return None
+        parts = urllib.parse.urlsplit(url)
+        query = "&".join(q for q in (parts.query, f"{LanCacheServer.SHA1_PARAM}={sha1}" if sha1 else "") if q)
+        return f"{self.mirror.rstrip('/')}/{parts.scheme}/{parts.netloc}{parts.path}{'?' + query if query else ''}"
+
+    def _download(self, job):
+        # Only hash-verified files go through the LAN cache, and a dead cache falls back to upstream
+        if self.mirror and job.get("sha1"):
+            try: return self._download_from(self.mirror_url(job["url"], job["sha1"]), job)
+            except Exception as e: print(f"LAN cache miss for {job['path'].name}: {e}")
+        self._download_from(job["url"], job)
+
+    def _get_bytes(self, url, use_mirror=True):
+        if self.mirror and use_mirror:
+            try:
+                resp = self.session.get(self.mirror_url(url), timeout=(10, 30))
+                resp.raise_for_status()
+                return resp.content
+            except Exception as e: print(f"LAN cache miss for {url}: {e}")
+        resp = self.session.get(url, timeout=(10, 30))
+        resp.raise_for_status()
+        return resp.content
+
+    def _download_from(self, url, job):
+        path = job["path"]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".part")
+        h = hashlib.sha1()
+        with self.session.get(url, stream=True, timeout=(10, 60)) as r:
+            r.raise_for_status()
+            with open(tmp, "wb") as f:
+                for chunk in r.iter_content(chunk_size=65536):
+                    h.update(chunk)
+                    f.write(chunk)
+        if job.get("sha1") and h.hexdigest() != job["sha1"]:
+            os.remove(tmp)
+            raise ValueError(f"Hash mismatch for {path.name}")
+        os.replace(tmp, path)
+
+    def _run_pool(self, fn, items, callback, status):
+        """Runs fn over items on the worker pool, reporting progress in the usual callback format."""
+        results, errors = [], []
+        if callback:
+            callback['setStatus'](status)
+            callback['setMax'](max(len(items), 1))
+            callback['setProgress'](0)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(fn, item): item for item in items}
+            for done, fut in enumerate(as_completed(futures), 1):
+                try: results.append((futures[fut], fut.result()))
+                except Exception as e: errors.append((futures[fut], e))
+                if callback: callback['setProgress'](done)
+        return results, errors
+
+    def _extract_native(self, native, target):
+        jar, exclude = native
+        # Jars are extracted in parallel into one folder and LWJGL 3 ones share subfolders, so
+        # ZipFile.extract's check-then-mkdir can race. Make the folders ourselves, exist_ok.
+        root = Path(target).resolve()
+        with zipfile.ZipFile(jar) as z:
+            for info in z.infolist():
+                if info.is_dir() or any(info.filename.startswith(e) for e in exclude): continue
+                dest = (root / info.filename).resolve()
+                if root not in dest.parents: continue
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                tmp = dest.with_name(f"{dest.name}.{uuid.uuid4().hex[:8]}.part")
+                with z.open(info) as src, open(tmp, "wb") as f: shutil.copyfileobj(src, f)
+                os.replace(tmp, dest)
+
+    # --- Public ---
+    def fetch(self, jobs, callback=None):
+        """Makes sure every job's file exists with the right hash, downloading the rest concurrently."""
+        checked, errors = self._run_pool(self._is_valid, jobs, callback, "Checking existing files...")
+        missing = [j for j, ok in checked if not ok] + [j for j, _ in errors]
+        print(f"{len(jobs)} files, {len(missing)} to download")
+
+        if missing:
+            _, errors = self._run_pool(self._download, missing, callback, f"Downloading {len(missing)} files...")
+            if errors:
+                job, err = errors[0]
+                raise RuntimeError(f"{len(errors)} downloads failed (e.g. {job['path'].name}: {err})")
+
+    def install_version(self, version_id, mc_dir, callback=None):
+        mc_dir = Path(mc_dir)
+        if callback: callback['setStatus'](f"Reading {version_id}...")
+        data = self._resolve(mc_dir, version_id)
+        jobs, natives = self.plan(data, mc_dir)
+
+        self.fetch(jobs, callback)
+
+        if natives:
+            target = mc_dir / "versions" / data["id"] / "natives"
+            target.mkdir(parents=True, exist_ok=True)
+            _, errors = self._run_pool(lambda n: self._extract_native(n, target), natives, callback, "Extracting natives...")
+            if errors: raise RuntimeError(f"Native extraction failed: {errors[0][1]}")
+
+        if "javaVersion" in data:
+            if callback: callback['setStatus']("Installing Java runtime...")
+            mclib.runtime.install_jvm_runtime(data["javaVersion"]["component"], str(mc_dir), callback=callback)
+
+        if callback: callback['setStatus']("Installation complete")
+
+    def install_fabric(self, mc_version, loader_version, mc_dir, callback=None):
+        """Installs Fabric from the meta profile JSON instead of running the installer jar.
+        Vanilla and loader libraries go through the same pool."""
+        if not loader_version: raise ValueError("No Fabric loader version available")
+        if callback: callback['setStatus']("Installing Fabric Loader...")
+        # The profile for an exact loader + game version never changes, so it is safe to take from the LAN cache
+        profile = json.loads(self._get_bytes(self.FABRIC_PROFILE_URL.format(mc=mc_version, loader=loader_version)))
+        # Point the launch classpath at the vanilla jar instead of keeping a second copy of it
+        profile.setdefault("jar", profile["inheritsFrom"])
+        path = self._version_json_path(mc_dir, profile["id"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(profile, indent=4))
+        self.install_version(profile["id"], mc_dir, callback)
+        return profile["id"]
+
+    def prefetch_forge(self, forge_ver, mc_dir, callback=None):
+        """Downloads the libraries a Forge installer needs through the pool (and LAN cache),
+        so mclib's installer finds them in place and only has to run the processors.
+        mclib still downloads the installer jar itself from the Forge maven."""
+        url = self.FORGE_INSTALLER_URL.format(version=forge_ver)
+        if callback: callback['setStatus'](f"Reading Forge {forge_ver} installer...")
+        try: sha1 = self._get_bytes(url + ".sha1", use_mirror=False).decode().strip() or None
+        except Exception: sha1 = None
+        installer = TEMP_DIR / f"forge-{forge_ver}-{uuid.uuid4().hex[:8]}-installer.jar"
         try:
-            resp = requests.get(f"{self.BASE}/project/{project_id}/version", params=params, headers=self.HEADERS)
-            if resp.status_code == 200:
-                data = resp.json()
-                if data: return data[0]['files'][0]
-        except: pass
+            self._download({"url": url, "path": installer, "sha1": sha1})
+            with zipfile.ZipFile(installer) as z:
+                names = z.namelist()
+                libraries = json.loads(z.read("install_profile.json")).get("libraries", [])
+                if "version.json" in names: libraries += json.loads(z.read("version.json")).get("libraries", [])
+        finally:
+            if installer.exists(): installer.unlink()
+        # Libraries produced by the processors have an empty url and are skipped by plan()
+        jobs, _ = self.plan({"libraries": libraries}, mc_dir)
+        if jobs: self.fetch(jobs, callback)
+
+# --- LAN Artifact Cache (read-through proxy for other machines) ---
+class LanCacheServer:
+    """Serves GET /<scheme>/<host>/<path> from LAN_CACHE_DIR, downloading from
+    <scheme>://<host>/<path> on the first request only. Concurrent misses for the
+    same artifact wait on one download, so each file leaves the site once.
+    Clients pass the expected hash as ?_sha1=, which is checked before anything
+    is stored and against every cached copy it is served from."""
+    SHA1_PARAM = "_sha1"
+    ALLOWED_HOSTS = {
+        "libraries.minecraft.net", "resources.download.minecraft.net", "piston-data.mojang.com",
+        "piston-meta.mojang.com", "launcher.mojang.com", "maven.fabricmc.net", "meta.fabricmc.net",
+        "maven.minecraftforge.net", "cdn.modrinth.com",
+    }
+
+    def __init__(self, port=25585, cache_dir=None, allowed_hosts=None, bind="0.0.0.0"):
+        self.port = port
+        self.bind = bind
+        self.cache_dir = Path(cache_dir or LAN_CACHE_DIR).resolve()
+        self.allowed_hosts = set(allowed_hosts or self.ALLOWED_HOSTS)
+        self.lock = threading.Lock()
+        self.key_locks = {}
+        self.stats = {"hits": 0, "misses": 0, "errors": 0, "evicted": 0}
+        self.httpd = None
+
+    def start(self):
+        server = self
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self): server._handle(self)
+            def log_message(self, *args): pass
+        self.httpd = http.server.ThreadingHTTPServer((self.bind, self.port), Handler)
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        print(f"LAN cache serving on port {self.port}")
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def _upstream(self, request_path):
+        """Maps /https/host/a/b?q&_sha1=h to (upstream url, cache path, expected sha1).
+        Returns None for anything not allowed."""
+        parts = urllib.parse.urlsplit(request_path)
+        bits = parts.path.lstrip("/").split("/", 2)
+        if len(bits) < 3 or bits[0] not in ("http", "https"): return None
+        scheme, netloc, rest = bits
+        if netloc.split(":")[0] not in self.allowed_hosts: return None
+        params = urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        sha1 = next((v.lower() for k, v in params if k == self.SHA1_PARAM), None)
+        upstream_query = urllib.parse.urlencode([(k, v) for k, v in params if k != self.SHA1_PARAM])
+        query = f"?{upstream_query}" if upstream_query else ""
+        cache_path = (self.cache_dir / scheme / netloc.replace(":", "_") / rest).resolve()
+        if query: cache_path = cache_path.with_name(cache_path.name + "_" + hashlib.sha1(query.encode()).hexdigest()[:12])
+        if self.cache_dir not in cache_path.parents: return None
+        return f"{scheme}://{netloc}/{rest}{query}", cache_path, sha1
+
+    def _cached_sha1(self, cache_path):
+        # Written next to each entry at store time so hits don't have to rehash big jars
+        sidecar = cache_path.with_name(cache_path.name + ".ibramod-sha1")
+        try: return sidecar.read_text().strip()
+        except OSError:
+            digest = file_sha1(cache_path)
+            sidecar.write_text(digest)
+            return digest
+
+    def _evict(self, cache_path):
+        for p in (cache_path, cache_path.with_name(cache_path.name + ".ibramod-sha1")):
+            try: p.unlink()
+            except FileNotFoundError: pass
+
+    def _ensure(self, url, cache_path, sha1=None):
+        with self.lock:
+            key_lock = self.key_locks.setdefault(str(cache_path), threading.Lock())
+        with key_lock:
+            if cache_path.is_file():
+                if not sha1 or self._cached_sha1(cache_path) == sha1:
+                    with self.lock: self.stats["hits"] += 1
+                    return
+                # Stored before we knew the hash (or corrupted since), drop it and fetch again
+                print(f"LAN cache evicting bad entry {cache_path.name}")
+                self._evict(cache_path)
+                with self.lock: self.stats["evicted"] += 1
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_name(cache_path.name + ".part")
+            h = hashlib.sha1()
+            try:
+                with requests.get(url, stream=True, timeout=(10, 60)) as r:
+                    r.raise_for_status()
+                    with open(tmp, "wb") as f:
+                        for chunk in r.iter_content(chunk_size=65536):
+                            h.update(chunk)
+                            f.write(chunk)
+                if sha1 and h.hexdigest() != sha1: raise ValueError(f"hash mismatch for {cache_path.name}")
+            except Exception:
+                if tmp.exists(): tmp.unlink()
+                raise
+            os.replace(tmp, cache_path)
+            cache_path.with_name(cache_path.name + ".ibramod-sha1").write_text(h.hexdigest())
+            with self.lock: self.stats["misses"] += 1
+
+    def _handle(self, req):
+        target = self._upstream(req.path)
+        if not target:
+            req.send_error(403, "Not an allowed artifact host")
+            return
+        url, cache_path, sha1 = target
+        try: self._ensure(url, cache_path, sha1)
+        except Exception as e:
+            with self.lock: self.stats["errors"] += 1
+            req.send_error(502, f"Upstream failed: {e}")
+            return
+        req.send_response(200)
+        req.send_header("Content-Type", "application/octet-stream")
+        req.send_header("Content-Length", str(cache_path.stat().st_size))
+        req.end_headers()
+        with open(cache_path, "rb") as f: shutil.copyfileobj(f, req.wfile)
+
+# --- Mods Folder Watcher ---
+class ModWatcher:
+    """Polls a mods folder and reports add/remove/rename/change events to listener(kind, filename, old_filename).
+    Backend operations call poll() right after touching the folder so the UI doesn't wait for the next tick."""
+    def __init__(self, mods_dir, listener, interval=1.0):
+        self.mods_dir = Path(mods_dir)
+        self.listener = listener
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snap = {}
+        try:
+            with os.scandir(self.mods_dir) as it:
+                for e in it:
+                    if e.is_file() and (e.name.endswith('.jar') or e.name.endswith('.disabled')):
+                        st = e.stat()
+                        snap[e.name] = (st.st_size, st.st_mtime_ns)
+        except FileNotFoundError: pass
+        return snap
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def stop(self): self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        with self.lock:
+            if self.stop_event.is_set(): return
+            new = self._scan()
+            old = self.snapshot
+            self.snapshot = new
+        removed = {n: old[n] for n in old.keys() - new.keys()}
+        added = {n: new[n] for n in new.keys() - old.keys()}
+        events = []
+        # Toggling keeps size and mtime, so a remove+add with the same stat is a rename
+        for name, stat in list(added.items()):
+            match = next((o for o, s in removed.items() if s == stat), None)
+            if match:
+                events.append(("rename", name, match))
+                del removed[match], added[name]
+        events += [("remove", n, None) for n in removed]
+        events += [("add", n, None) for n in added]
+        events += [("change", n, None) for n in new.keys() & old.keys() if new[n] != old[n]]
+        for kind, name, prev in events:
+            try: self.listener(kind, name, prev)
+            except Exception as e: print(f"Mod watcher listener failed: {e}")
+
+# --- JVM Telemetry (GC log parsing + heap recommendations) ---
+GC_PROFILES = {
+    "default": [],
+    # Aikar-style G1 tuning, what "Low End PC Mode" has always used
+    "g1_tuned": [
+        "-XX:+UseG1GC", "-XX:+ParallelRefProcEnabled", "-XX:MaxGCPauseMillis=200",
+        "-XX:+UnlockExperimentalVMOptions", "-XX:+DisableExplicitGC", "-XX:+AlwaysPreTouch",
+        "-XX:G1NewSizePercent=30", "-XX:G1MaxNewSizePercent=40", "-XX:G1HeapRegionSize=8M",
+        "-XX:G1ReservePercent=20", "-XX:G1HeapWastePercent=5", "-XX:G1MixedGCCountTarget=4"
+    ],
+}
+
+def get_system_ram_gb():
+    try:
+        if platform.system() == "Windows":
+            import ctypes
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                            ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                            ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                            ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                            ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+            stat = MEMORYSTATUSEX()
+            stat.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(stat))
+            return stat.ullTotalPhys / 1024**3
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024**3
+    except Exception:
         return None
 
-    def get_project_versions(self, project_id):
-        try: return requests.get(f"{self.BASE}/project/{project_id}/version", headers=self.HEADERS).json()
-        except: return []
+class GcLogParser:
+    """Incremental parser for unified JVM GC logs (-Xlog:gc*). Feed it lines as they
+    are written and call metrics() whenever a summary is needed."""
+    # [12.345s][info][gc] GC(7) Pause Young (Normal) (G1 Evacuation Pause) 120M->40M(512M) 5.123ms
+    PAUSE_RE = re.compile(r"\[(?P<up>[\d.]+)s\].*?GC\(\d+\) (?P<kind>Pause .*?) "
+                          r"(?P<before>\d+)(?P<bu>[KMG])->(?P<after>\d+)(?P<au>[KMG])\((?P<cap>\d+)(?P<cu>[KMG])\) (?P<ms>[\d.]+)ms")
+    UPTIME_RE = re.compile(r"^\[(?P<up>[\d.]+)s\]")
+    UNITS = {"K": 1 / 1024, "M": 1, "G": 1024}
+
+    def __init__(self):
+        self.pauses = []        # ms
+        self.full_gcs = 0
+        self.allocated_mb = 0.0
+        self.peak_used_mb = 0.0
+        self.peak_live_mb = 0.0
+        self.peak_capacity_mb = 0.0
+        self.first_uptime = None
+        self.last_uptime = 0.0
+        self.last_after_mb = None
+
+    def feed(self, line):
+        m = self.UPTIME_RE.match(line)
+        if not m: return
+        up = float(m.group("up"))
+        if self.first_uptime is None: self.first_uptime = up
+        self.last_uptime = max(self.last_uptime, up)
+        m = self.PAUSE_RE.search(line)
+        if not m: return
+        before = int(m.group("before")) * self.UNITS[m.group("bu")]
+        after = int(m.group("after")) * self.UNITS[m.group("au")]
+        self.pauses.append(float(m.group("ms")))
+        if "Full" in m.group("kind"): self.full_gcs += 1
+        # Everything the heap grew by since the last collection was allocated by the game
+        if self.last_after_mb is not None and before > self.last_after_mb: self.allocated_mb += before - self.last_after_mb
+        elif self.last_after_mb is None: self.allocated_mb += before
+        self.last_after_mb = after
+        self.peak_used_mb = max(self.peak_used_mb, before)
+        # Heap left after a collection is an upper bound on what the game really keeps alive
+        self.peak_live_mb = max(self.peak_live_mb, after)
+        self.peak_capacity_mb = max(self.peak_capacity_mb, int(m.group("cap")) * self.UNITS[m.group("cu")])
+
+    def _percentile(self, p):
+        if not self.pauses: return 0.0
+        ordered = sorted(self.pauses)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+    def metrics(self):
+        duration = self.last_uptime - (self.first_uptime or 0)
+        gc_ms = sum(self.pauses)
+        return {
+            "duration_s": round(duration, 1),
+            "gc_count": len(self.pauses),
+            "full_gc_count": self.full_gcs,
+            "pause_p50_ms": round(self._percentile(50), 2),
+            "pause_p99_ms": round(self._percentile(99), 2),
+            "pause_max_ms": round(max(self.pauses, default=0.0), 2),
+            "gc_time_ms": round(gc_ms, 1),
+            "gc_time_pct": round(gc_ms / (duration * 10), 2) if duration > 0 else 0.0,
+            "alloc_rate_mb_s": round(self.allocated_mb / duration, 1) if duration > 0 else 0.0,
+            "peak_heap_mb": round(self.peak_used_mb),
+            "peak_live_mb": round(self.peak_live_mb),
+            "heap_capacity_mb": round(self.peak_capacity_mb),
+        }
+
+class GcLogMonitor:
+    """Tails a GC log on a background thread while the game runs."""
+    def __init__(self, path, interval=1.0):
+        self.path = Path(path)
+        self.interval = interval
+        self.parser = GcLogParser()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.offset = 0
+        self.partial = b""
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval): self._read()
+
+    def _read(self):
+        try: size = self.path.stat().st_size
+        except FileNotFoundError: return
+        if size < self.offset:
+            # Rotated or truncated, the file starts over from empty
+            self.offset, self.partial = 0, b""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+            self.offset = f.tell()
+        lines = (self.partial + chunk).split(b"\n")
+        self.partial = lines.pop()  # last piece may be a half-written line
+        for line in lines: self.parser.feed(line.decode("utf-8", errors="replace"))
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread: self.thread.join()
+        self._read()
+        if self.partial: self.parser.feed(self.partial.decode("utf-8", errors="replace"))
+        self.partial = b""
+        return self.parser.metrics()
 
 # --- Backend Logic ---
 class Backend:
     def __init__(self):
+        # Create folders if they don't exist (here rather than at import, so importing the module has no side effects)
+        for d in (BASE_DIR, TEMP_DIR, MANIFEST_DIR): d.mkdir(parents=True, exist_ok=True)
         self.modrinth = Modrinth()
+        self.cache_lock = threading.Lock()   # name_cache is touched by the Tk thread, the mods watcher and bulk workers
         self.name_cache = self.load_cache()
+        self.manifests = ManifestService(offline=self.get_settings().get("offline_mode", False))
+        self.installer = InstallEngine(self.manifests)
+        self.artifacts = ArtifactStore(self.installer)
+        self.mod_watcher = None
+        self.lan_server = None
+        self.apply_network_settings(self.get_settings())
+        self.manifests.refresh_all()
         self.discord_rpc = None
         self.connect_discord()
 
@@ -116,16 +1132,34 @@ class Backend:
         return {}
 
     def save_cache(self):
-        with open(CACHE_FILE, "w") as f: json.dump(self.name_cache, f, indent=4)
+        # Write to a temp file and swap it in, a half-written cache would be thrown away by load_cache
+        with self.cache_lock:
+            tmp = CACHE_FILE.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.name_cache, indent=4))
+            os.replace(tmp, CACHE_FILE)
 
     def get_settings(self):
         if SETTINGS_FILE.exists():
             try: return json.loads(SETTINGS_FILE.read_text())
             except: pass
-        return {"max_ram": 4, "java_path": "Auto", "low_end_mode": False}
+        return {"max_ram": 4, "java_path": "Auto", "low_end_mode": False, "offline_mode": False,
+                "gc_telemetry": False, "auto_tune": False,
+                "lan_cache_url": "", "lan_cache_server": False, "lan_cache_port": 25585}
 
     def save_settings(self, data):
         with open(SETTINGS_FILE, "w") as f: json.dump(data, f, indent=4)
+        self.manifests.offline = data.get("offline_mode", False)
+        self.apply_network_settings(data)
+
+    def apply_network_settings(self, settings):
+        self.installer.mirror = settings.get("lan_cache_url") or None
+        want_server = settings.get("lan_cache_server", False)
+        if want_server and not self.lan_server:
+            try: self.lan_server = LanCacheServer(port=settings.get("lan_cache_port", 25585)).start()
+            except OSError as e: print(f"LAN cache server failed to start: {e}")
+        elif not want_server and self.lan_server:
+            self.lan_server.stop()
+            self.lan_server = None
 
     # --- UPDATED JAVA LOGIC (Windows + Linux Support) ---
     def find_java_paths(self):
@@ -173,6 +1207,25 @@ class Backend:
             return user_setting
 
         # 1. Determine which Java version i need
+        req_ver = self.required_java(mc_version)
+        print(f"Version {mc_version} requires Java {req_ver}")
+
+        # 2. Find the best match
+        available_paths = self.find_java_paths()
+        best_match = None
+        
+        for p in available_paths:
+            if p == "Auto": continue
+            path_str = p.lower()
+            
+            # Look for version numbers in the path string
+            if req_ver == 21 and ("21" in path_str): return p
+            if req_ver == 17 and ("17" in path_str): best_match = p
+            if req_ver == 8 and ("1.8" in path_str or "8" in path_str): best_match = p
+
+        return best_match
+
+    def required_java(self, mc_version):
         req_ver = 8  # Default for old versions
         
         try:
@@ -194,26 +1247,10 @@ class Backend:
                         req_ver = 17
         except:
             print(f"Could not parse version {mc_version}, defaulting to Java 8")
-
-        print(f"Version {mc_version} requires Java {req_ver}")
-
-        # 2. Find the best match
-        available_paths = self.find_java_paths()
-        best_match = None
-        
-        for p in available_paths:
-            if p == "Auto": continue
-            path_str = p.lower()
-            
-            # Look for version numbers in the path string
-            if req_ver == 21 and ("21" in path_str): return p
-            if req_ver == 17 and ("17" in path_str): best_match = p
-            if req_ver == 8 and ("1.8" in path_str or "8" in path_str): best_match = p
-
-        return best_match
+        return req_ver
 
     def get_latest_mc_version(self):
-        try: return mclib.utils.get_latest_version()["release"]
+        try: return self.manifests.latest_release()
         except: return None
 
     def get_instances(self):
@@ -223,14 +1260,19 @@ class Backend:
         try: return json.loads((BASE_DIR / name / "instance.json").read_text())
         except: return {"version": "Unknown", "loader": "Vanilla"}
 
+    def save_instance_config(self, name, data):
+        with open(BASE_DIR / name / "instance.json", "w") as f: json.dump(data, f)
+
     def launch(self, name, username):
         inst_dir = BASE_DIR / name
         mc_dir = inst_dir / ".minecraft"
         config = self.get_instance_config(name)
         settings = self.get_settings()
         
-        ram_gb = settings.get("max_ram", 4)
-        low_end = settings.get("low_end_mode", False)
+        # Per-instance JVM settings (from the Performance tab / auto-tune) win over the global ones
+        jvm = config.get("jvm", {})
+        ram_gb = jvm.get("heap_gb", settings.get("max_ram", 4))
+        gc_profile = jvm.get("gc_profile") or ("g1_tuned" if settings.get("low_end_mode", False) else "default")
         
         java_path = self.get_smart_java(config.get("version", "1.20"), settings.get("java_path", "Auto"))
 
@@ -250,14 +1292,21 @@ class Backend:
 
         # --- JVM ARGUMENTS ---
         jvm_args = [f"-Xmx{ram_gb}G", "-Xms512M"]
-        if low_end:
-            print("Enabling Low End PC Optimizations...")
-            jvm_args.extend([
-                "-XX:+UseG1GC", "-XX:+ParallelRefProcEnabled", "-XX:MaxGCPauseMillis=200",
-                "-XX:+UnlockExperimentalVMOptions", "-XX:+DisableExplicitGC", "-XX:+AlwaysPreTouch",
-                "-XX:G1NewSizePercent=30", "-XX:G1MaxNewSizePercent=40", "-XX:G1HeapRegionSize=8M",
-                "-XX:G1ReservePercent=20", "-XX:G1HeapWastePercent=5", "-XX:G1MixedGCCountTarget=4"
-            ])
+        if gc_profile != "default":
+            print(f"Enabling GC profile {gc_profile}...")
+            jvm_args.extend(GC_PROFILES.get(gc_profile, []))
+
+        # Unified GC logging needs Java 9+, so only for versions that run on 17/21
+        monitor = None
+        mc_version = self.parse_version_id(ver_id or config.get("version", ""))[0] or ""
+        if settings.get("gc_telemetry", False) and self.required_java(mc_version) >= 17:
+            tel_dir = inst_dir / "telemetry"
+            tel_dir.mkdir(exist_ok=True)
+            log_name = f"gc-{int(time.time())}.log"
+            # Relative to the game dir, a Windows drive colon would break the -Xlog syntax.
+            # filecount=0 turns off HotSpot's 5x20MB rotation, which would pull the file out from under GcLogMonitor
+            jvm_args.append(f"-Xlog:gc*:file=../telemetry/{log_name}:uptime,level,tags:filecount=0")
+            monitor = GcLogMonitor(tel_dir / log_name).start()
 
         options = {
             "launcherName": APP_NAME,
@@ -285,49 +1334,145 @@ class Backend:
         
         self.update_discord("Idling", "In Launcher")
 
+        if monitor:
+            metrics = monitor.stop()
+            if metrics["gc_count"]:
+                self.record_session(name, dict(metrics, heap_gb=ram_gb, gc_profile=gc_profile, mod_count=self.count_enabled_mods(name)))
+                if settings.get("auto_tune", False):
+                    rec = self.recommend_jvm(name)
+                    print(f"Auto-tune: {rec['heap_gb']} GB, {rec['gc_profile']} ({'; '.join(rec['reasons'])})")
+                    self.apply_jvm_settings(name, rec)
+
+    # --- JVM TELEMETRY ---
+    def get_telemetry(self, name):
+        try: return json.loads((BASE_DIR / name / "telemetry.json").read_text()).get("sessions", [])
+        except: return []
+
+    def record_session(self, name, metrics):
+        sessions = self.get_telemetry(name) + [dict(metrics, time=int(time.time()))]
+        with open(BASE_DIR / name / "telemetry.json", "w") as f: json.dump({"sessions": sessions[-20:]}, f, indent=4)
+        # Raw logs are only needed while the game runs, keep a few for debugging
+        logs = sorted((BASE_DIR / name / "telemetry").glob("gc-*.log"))
+        for old in logs[:-5]:
+            try: old.unlink()
+            except OSError: pass
+
+    def count_enabled_mods(self, name):
+        mods_dir = BASE_DIR / name / ".minecraft/mods"
+        return len(list(mods_dir.glob("*.jar"))) if mods_dir.exists() else 0
+
+    def recommend_jvm(self, name):
+        """Suggests heap size and GC profile from the last session's GC metrics,
+        falling back to mod count when there is no telemetry yet."""
+        mods = self.count_enabled_mods(name)
+        system_gb = get_system_ram_gb()
+        last = (self.get_telemetry(name) or [None])[-1]
+        reasons = []
+
+        if last:
+            # A heap around 2.5x the live set leaves G1 room without wasting RAM
+            live_gb = last.get("peak_live_mb", 0) / 1024
+            heap = max(2, math.ceil(live_gb * 2.5))
+            reasons.append(f"live set peaked at {live_gb:.1f} GB")
+            if last.get("full_gc_count"):
+                heap = max(heap, int(last.get("heap_gb", heap)) + 2)
+                reasons.append(f"{last['full_gc_count']} full GCs last session")
+            slow = last.get("pause_p99_ms", 0) > 50 or last.get("gc_time_pct", 0) > 3 or last.get("full_gc_count")
+            gc_profile = "g1_tuned" if slow else "default"
+            if slow: reasons.append(f"p99 pause {last.get('pause_p99_ms')} ms, {last.get('gc_time_pct')}% time in GC")
+        else:
+            heap = 2 if mods == 0 else 4 if mods <= 50 else 6 if mods <= 150 else 8
+            gc_profile = "g1_tuned" if mods > 50 else "default"
+            reasons.append(f"{mods} mods, no telemetry yet")
+
+        if system_gb:
+            cap = max(2, min(int(system_gb * 0.6), int(system_gb) - 2))
+            if heap > cap:
+                heap = cap
+                reasons.append(f"capped for {system_gb:.0f} GB system RAM")
+            if system_gb <= 8: gc_profile = "g1_tuned"
+        return {"heap_gb": heap, "gc_profile": gc_profile, "reasons": reasons}
+
+    def apply_jvm_settings(self, name, rec):
+        cfg = self.get_instance_config(name)
+        if rec: cfg["jvm"] = {"heap_gb": rec["heap_gb"], "gc_profile": rec["gc_profile"]}
+        else: cfg.pop("jvm", None)
+        self.save_instance_config(name, cfg)
+
     def delete_instance(self, name):
         try: shutil.rmtree(BASE_DIR / name); return True
         except: return False
 
+    def get_clean_name(self, path):
+        key = f"{path.name}_{path.stat().st_size}"
+        with self.cache_lock:
+            if key in self.name_cache: return self.name_cache[key], False
+        clean = path.name
+        try:
+            with zipfile.ZipFile(path, 'r') as z:
+                if 'fabric.mod.json' in z.namelist():
+                    clean = json.loads(z.read('fabric.mod.json')).get('name', path.name)
+        except: pass
+        with self.cache_lock: self.name_cache[key] = clean
+        return clean, True
+
+    def get_mod_entry(self, path):
+        path = Path(path)
+        name, cache_updated = self.get_clean_name(path)
+        if cache_updated: self.save_cache()
+        return {'name': name, 'filename': path.name, 'path': path, 'disabled': path.name.endswith('.disabled')}
+
     def get_mods(self, instance_name):
         mods_dir = BASE_DIR / instance_name / ".minecraft/mods"
         if not mods_dir.exists(): return []
         found = []
         cache_updated = False
-        def get_clean_name(path):
-            key = f"{path.name}_{path.stat().st_size}"
-            if key in self.name_cache: return self.name_cache[key]
-            clean = path.name
-            try:
-                with zipfile.ZipFile(path, 'r') as z:
-                    if 'fabric.mod.json' in z.namelist():
-                        clean = json.loads(z.read('fabric.mod.json')).get('name', path.name)
-            except: pass
-            self.name_cache[key] = clean
-            return clean
-        
         for f in mods_dir.iterdir():
             if f.name.endswith('.jar') or f.name.endswith('.disabled'):
-                found.append({'name': get_clean_name(f), 'filename': f.name, 'path': f, 'disabled': f.name.endswith('.disabled')})
-                if f.name not in self.name_cache: cache_updated = True
-        
+                name, updated = self.get_clean_name(f)
+                cache_updated |= updated
+                found.append({'name': name, 'filename': f.name, 'path': f, 'disabled': f.name.endswith('.disabled')})
         if cache_updated: self.save_cache()
         return sorted(found, key=lambda x: x['name'].lower())
 
+    def create_mod_watcher(self, instance_name, listener):
+        # Takes its snapshot now, so create it before scanning the mods to not miss changes in between
+        return ModWatcher(BASE_DIR / instance_name / ".minecraft/mods", listener)
+
+    def watch_mods(self, watcher):
+        """Makes watcher the active one, replacing any previous watcher."""
+        self.stop_watching_mods()
+        self.mod_watcher = watcher.start()
+
+    def stop_watching_mods(self):
+        if self.mod_watcher: self.mod_watcher.stop()
+        self.mod_watcher = None
+
+    def watched_instance(self):
+        return self.mod_watcher.mods_dir.parent.parent.name if self.mod_watcher else None
+
+    def notify_mods_changed(self):
+        # Push our own changes out right away instead of waiting for the next poll
+        if self.mod_watcher: self.mod_watcher.poll()
+
     def toggle_mod(self, path):
         p = Path(path)
         try:
             if p.name.endswith(".disabled"): p.rename(p.parent / p.name[:-9])
             else: p.rename(p.parent / (p.name + ".disabled"))
+            self.notify_mods_changed()
             return True
         except: return False
     
     def delete_mod(self, path):
-        try: os.remove(path); return True
+        try:
+            os.remove(path)
+            self.notify_mods_changed()
+            return True
         except: return False
 
     # --- INSTALLATION WITH CALLBACKS ---
-    def install_instance(self, name, version, loader, callback=None):
+    def install_instance(self, name, version, loader, callback=None, loader_version=None):
         inst_dir = BASE_DIR / name
         if inst_dir.exists(): return False, "Instance name already exists."
         
@@ -336,52 +1481,136 @@ class Backend:
         mc_dir.mkdir(parents=True, exist_ok=True)
         
         try:
-            print(f"Installing Vanilla {version}...")
-            mclib.install.install_minecraft_version(version, str(mc_dir), callback=callback)
-            
-            if loader == "Fabric":
-                if callback: callback['setStatus']("Installing Fabric Loader...")
-                mclib.fabric.install_fabric(version, str(mc_dir))
-            elif loader == "Forge":
-                if callback: callback['setStatus']("Searching for Forge...")
-                forge_ver = mclib.forge.find_forge_version(version)
-                if forge_ver is None: raise ValueError(f"No Forge found for {version}")
-                if callback: callback['setStatus'](f"Installing Forge {forge_ver}...")
-                mclib.forge.install_forge_version(forge_ver, str(mc_dir))
+            if self.manifests.offline:
+                loader_version = self.install_offline(version, loader, mc_dir, callback, loader_version)
+            else:
+                if loader == "Fabric":
+                    # The Fabric profile inherits from vanilla, so both get installed in one pass
+                    if not self.manifests.fabric_supports(version): raise ValueError(f"Fabric does not support {version}")
+                    loader_version = loader_version or self.manifests.latest_fabric_loader()
+                    self.installer.install_fabric(version, loader_version, mc_dir, callback)
+                else:
+                    print(f"Installing Vanilla {version}...")
+                    self.installer.install_version(version, mc_dir, callback)
+
+                if loader == "Forge":
+                    if callback: callback['setStatus']("Searching for Forge...")
+                    loader_version = loader_version or self.manifests.latest_forge(version)
+                    if loader_version is None: raise ValueError(f"No Forge found for {version}")
+                    if self.installer.mirror:
+                        try: self.installer.prefetch_forge(loader_version, mc_dir, callback)
+                        except Exception as e: print(f"Forge prefetch failed, mclib will download everything: {e}")
+                    if callback: callback['setStatus'](f"Installing Forge {loader_version}...")
+                    mclib.forge.install_forge_version(loader_version, str(mc_dir))
+
+                # Keep a copy around so the same version can be installed offline later
+                if callback: callback['setStatus']("Saving to local artifact store...")
+                try: self.artifacts.store(mc_dir)
+                except Exception as e: print(f"Artifact store failed: {e}")
             
-            with open(inst_dir / "instance.json", "w") as f: 
-                json.dump({"name": name, "version": version, "loader": loader}, f)
+            self.save_instance_config(name, {"name": name, "version": version, "loader": loader, "loader_version": loader_version})
                 
             return True, "Created"
         except Exception as e:
             if inst_dir.exists(): shutil.rmtree(inst_dir)
             return False, f"Error: {str(e)}"
 
+    def install_offline(self, version, loader, mc_dir, callback=None, loader_version=None):
+        # Pick the loader build from the cached manifests, falling back to whatever the store has.
+        # A pinned loader_version (from a lockfile) must match exactly.
+        version_ids = [version]
+        if loader == "Fabric":
+            lv = loader_version or self.manifests.latest_fabric_loader()
+            vid = f"fabric-loader-{lv}-{version}" if lv else None
+            if not loader_version and (not vid or not self.artifacts.has_version(vid)):
+                found = self.artifacts.find_versions(f"fabric-loader-*-{version}")
+                vid = found[0] if found else vid
+            version_ids.append(vid or f"fabric-loader-?-{version}")
+        elif loader == "Forge":
+            if loader_version: vid = self.forge_version_id(loader_version)
+            else:
+                builds = [b for b in self.manifests.forge_builds(version) if self.artifacts.has_version(self.forge_version_id(b))]
+                if builds: vid = self.forge_version_id(builds[0])
+                else:
+                    found = self.artifacts.find_versions(f"{version}-forge-*")
+                    vid = found[0] if found else f"{version}-forge-?"
+            version_ids.append(vid)
+        if callback: callback['setStatus'](f"Installing {', '.join(version_ids)} from local store...")
+        self.artifacts.restore(mc_dir, version_ids)
+        return self.parse_version_id(version_ids[-1])[2]
+
+    def parse_version_id(self, vid):
+        """Splits an installed version id into (minecraft version, loader, loader version)."""
+        if vid.startswith("fabric-loader-"):
+            lv, _, mc = vid[len("fabric-loader-"):].partition("-")
+            return mc, "Fabric", lv
+        if vid.startswith("quilt-loader-"):
+            lv, _, mc = vid[len("quilt-loader-"):].partition("-")
+            return mc, "Quilt", lv
+        if vid.startswith("neoforge-"):
+            # NeoForge ids don't carry the game version
+            return None, "NeoForge", vid[len("neoforge-"):]
+        if "-forge-" in vid:
+            mc, _, build = vid.partition("-forge-")
+            return mc, "Forge", f"{mc}-{build}"
+        return vid, "Vanilla", None
+
+    def mod_target(self, name):
+        """(Modrinth loader, game version) to look mods up with for an instance.
+        Modpacks store a loader version id like fabric-loader-0.15.7-1.20.1 as their version."""
+        cfg = self.get_instance_config(name)
+        loader, vid = cfg.get('loader', 'Vanilla'), cfg.get('version') or ""
+        mc_version, parsed, _ = self.parse_version_id(vid)
+        mc_dir = BASE_DIR / name / ".minecraft"
+        if parsed != "Vanilla": loader = parsed
+        elif loader not in ("Vanilla", "Fabric", "Forge"):
+            installed = [v['id'] for v in mclib.utils.get_installed_versions(str(mc_dir))]
+            vid = next((v for v in installed if self.parse_version_id(v)[1] != "Vanilla"), vid)
+            mc_version, loader, _ = self.parse_version_id(vid)
+        if mc_version is None:
+            # NeoForge ids don't carry the game version, the one it inherits from does
+            try: mc_version = json.loads((mc_dir / "versions" / vid / f"{vid}.json").read_text(encoding="utf-8")).get("inheritsFrom")
+            except (OSError, ValueError): pass
+        loader_filter = loader.lower()
+        if loader_filter in ("vanilla", "modpack"): loader_filter = "fabric"
+        return loader_filter, mc_version
+
+    def forge_version_id(self, forge_ver):
+        # "1.20.1-47.2.0" is installed as versions/1.20.1-forge-47.2.0
+        mc, _, build = forge_ver.partition("-")
+        return f"{mc}-forge-{build}"
+
     def install_mod_from_store(self, project_id, instance_name, callback=None):
-        cfg = self.get_instance_config(instance_name)
-        loader_filter = cfg['loader'].lower()
-        if loader_filter == "vanilla": loader_filter = "fabric" 
-        target = self.modrinth.get_latest_version_file(project_id, [loader_filter], [cfg['version']])
+        loader_filter, mc_version = self.mod_target(instance_name)
+        if not mc_version: return False, "Could not tell which Minecraft version this instance runs."
+        try: target = self.modrinth.get_latest_version_file(project_id, [loader_filter], [mc_version])
+        except ModrinthError as e: return False, str(e)
         if not target: return False, "No compatible version found on Modrinth."
         
         save_path = BASE_DIR / instance_name / ".minecraft/mods" / target['filename']
         save_path.parent.mkdir(parents=True, exist_ok=True)
         
+        # Download next to the target and rename at the end, so the mods watcher never sees half a jar
+        part_path = save_path.with_name(save_path.name + ".part")
         try:
             if callback: callback['setStatus'](f"Downloading {target['filename']}...")
-            with requests.get(target['url'], stream=True, headers=self.modrinth.HEADERS) as r:
+            with requests.get(target['url'], stream=True, headers=self.modrinth.HEADERS, timeout=Modrinth.TIMEOUT) as r:
                 r.raise_for_status()
                 total_len = int(r.headers.get('content-length', 0))
                 dl = 0
-                with open(save_path, 'wb') as f:
+                with open(part_path, 'wb') as f:
                      for chunk in r.iter_content(chunk_size=4096):
                         dl += len(chunk)
                         f.write(chunk)
                         if callback and total_len > 0:
                             callback['setProgress'](int((dl / total_len) * 100))
                             callback['setMax'](100)
+            os.replace(part_path, save_path)
+            if instance_name == self.watched_instance(): self.notify_mods_changed()
             return True, f"Installed {target['filename']}"
-        except Exception as e: return False, str(e)
+        except Exception as e:
+            if part_path.exists(): os.remove(part_path)
+            return False, str(e)
 
     def install_modpack_from_store(self, project_id, pack_name, version_data, callback=None):
         inst_dir = BASE_DIR / pack_name
@@ -391,7 +1620,7 @@ class Backend:
             target_file = version_data['files'][0]
             temp_path = TEMP_DIR / target_file['filename']
             if callback: callback['setStatus'](f"Downloading {target_file['filename']}...")
-            with requests.get(target_file['url'], stream=True, headers=self.modrinth.HEADERS) as r:
+            with requests.get(target_file['url'], stream=True, headers=self.modrinth.HEADERS, timeout=Modrinth.TIMEOUT) as r:
                 total_len = int(r.headers.get('content-length', 0))
                 dl = 0
                 with open(temp_path, 'wb') as f:
@@ -419,8 +1648,7 @@ class Backend:
                     break
             if not final_version_id and installed_vers: final_version_id = installed_vers[0]['id']
 
-            with open(inst_dir / "instance.json", "w") as f:
-                json.dump({"name": pack_name, "version": final_version_id, "loader": loader_type}, f)
+            self.save_instance_config(pack_name, {"name": pack_name, "version": final_version_id, "loader": loader_type})
             
             os.remove(temp_path)
             return True, f"Installed {pack_name}"
@@ -428,6 +1656,203 @@ class Backend:
             if inst_dir.exists(): shutil.rmtree(inst_dir)
             return False, str(e)
 
+    # --- LOCKFILES ---
+    LOCK_OVERRIDE_DIRS = ["config"]
+    LOCK_LOADERS = ("Vanilla", "Fabric", "Forge")     # what install_instance can reproduce
+
+    def export_lockfile(self, name, out_path, callback=None):
+        mc_dir = BASE_DIR / name / ".minecraft"
+        cfg = self.get_instance_config(name)
+        mc_version, loader, loader_version = cfg.get("version"), cfg.get("loader", "Vanilla"), cfg.get("loader_version")
+        if not loader_version:
+            # Older instances and modpacks don't record the loader build, read it off the installed versions
+            installed = [v['id'] for v in mclib.utils.get_installed_versions(str(mc_dir))]
+            found = next((p for p in map(self.parse_version_id, installed) if p[1] != "Vanilla"), None)
+            if found: mc_version, loader, loader_version = found
+            elif loader in ("Fabric", "Forge"): return False, f"Could not find the installed {loader} build for {name}."
+            else:
+                if mc_version not in installed and installed: mc_version = installed[0]
+                loader = "Vanilla"
+        if loader not in self.LOCK_LOADERS:
+            return False, f"Unsupported loader {loader}: lockfiles can only reproduce {', '.join(self.LOCK_LOADERS)} instances."
+
+        try:
+            if callback: callback['setStatus']("Hashing mods...")
+            mods_dir = mc_dir / "mods"
+            files = sorted(f for f in mods_dir.iterdir() if f.name.endswith('.jar') or f.name.endswith('.disabled')) if mods_dir.exists() else []
+            hashes = {file_sha1(f): f for f in files}
+            if callback: callback['setStatus']("Looking up mods on Modrinth...")
+            known = self.modrinth.get_versions_from_hashes(list(hashes))
+
+            mods, unresolved = [], []
+            for sha1, f in hashes.items():
+                version = known.get(sha1)
+                remote = next((x for x in (version or {}).get('files', []) if x.get('hashes', {}).get('sha1') == sha1), None)
+                if not remote:
+                    unresolved.append(f.name)
+                    continue
+                mods.append({"filename": f.name, "url": remote['url'], "sha1": sha1, "size": f.stat().st_size,
+                             "project_id": version.get('project_id'), "version_id": version.get('id')})
+
+            overrides = []
+            for sub in self.LOCK_OVERRIDE_DIRS:
+                root = mc_dir / sub
+                if not root.exists(): continue
+                for f in sorted(root.rglob("*")):
+                    if not f.is_file(): continue
+                    data = f.read_bytes()
+                    overrides.append({"path": f.relative_to(mc_dir).as_posix(), "sha1": hashlib.sha1(data).hexdigest(),
+                                      "data": base64.b64encode(data).decode()})
+
+            lock = {"format": LOCKFILE_FORMAT, "name": name, "minecraft": mc_version, "loader": loader,
+                    "loader_version": loader_version, "mods": mods, "overrides": overrides}
+            with open(out_path, "w") as f: json.dump(lock, f, indent=2)
+        except Exception as e: return False, str(e)
+
+        msg = f"Exported {len(mods)} mods and {len(overrides)} config files."
+        if unresolved: msg += f"\nNot on Modrinth, left out: {', '.join(unresolved)}"
+        return True, msg
+
+    def install_from_lockfile(self, lock_path, name, callback=None):
+        try: lock = json.loads(Path(lock_path).read_text())
+        except Exception as e: return False, f"Could not read lockfile: {e}"
+        if lock.get("format") != LOCKFILE_FORMAT: return False, f"Unsupported lockfile format {lock.get('format')}"
+        if lock.get("loader") not in self.LOCK_LOADERS: return False, f"Unsupported loader {lock.get('loader')}"
+
+        res, msg = self.install_instance(name, lock["minecraft"], lock["loader"], callback, loader_version=lock.get("loader_version"))
+        if not res: return res, msg
+
+        inst_dir = BASE_DIR / name
+        mc_dir = (inst_dir / ".minecraft").resolve()
+        try:
+            jobs = []
+            for m in lock.get("mods", []):
+                if Path(m["filename"]).name != m["filename"]: raise ValueError(f"Bad mod filename {m['filename']}")
+                jobs.append({"url": m["url"], "path": mc_dir / "mods" / m["filename"], "sha1": m["sha1"], "size": m.get("size")})
+            if jobs: self.installer.fetch(jobs, callback)
+
+            if callback: callback['setStatus']("Applying config overrides...")
+            for o in lock.get("overrides", []):
+                target = (mc_dir / o["path"]).resolve()
+                if mc_dir not in target.parents: raise ValueError(f"Override outside instance: {o['path']}")
+                data = base64.b64decode(o["data"])
+                if hashlib.sha1(data).hexdigest() != o["sha1"]: raise ValueError(f"Hash mismatch for {o['path']}")
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(data)
+            return True, f"Installed {name} from lockfile"
+        except Exception as e:
+            if inst_dir.exists(): shutil.rmtree(inst_dir)
+            return False, f"Error: {str(e)}"
+
+    # --- BULK OPERATIONS ---
+    BULK_ACTIONS = ["Install", "Update", "Remove", "Enable", "Disable"]
+
+    def get_mod_projects(self, instance_names):
+        """Maps installed mod files to Modrinth projects with one hash lookup for all instances.
+        Returns {instance: {project_id: [path, ...]}}."""
+        files = {}
+        for name in instance_names:
+            mods_dir = BASE_DIR / name / ".minecraft/mods"
+            if not mods_dir.exists(): continue
+            for f in mods_dir.iterdir():
+                if f.name.endswith('.jar') or f.name.endswith('.disabled'):
+                    files[f] = (name, file_sha1(f))
+        known = self.modrinth.get_versions_from_hashes(list({h for _, h in files.values()}))
+        result = {name: {} for name in instance_names}
+        for path, (name, sha1) in files.items():
+            version = known.get(sha1)
+            if version: result[name].setdefault(version['project_id'], []).append(path)
+        return result
+
+    def bulk_operation(self, action, project_ids, instance_names, callback=None):
+        if callback: callback['setStatus']("Checking installed mods...")
+        installed = self.get_mod_projects(instance_names)
+        done, skipped, failed = 0, [], []
+        touched = set()
+
+        if action in ("Install", "Update"):
+            # Resolve once per (loader, game version) instead of once per instance
+            groups = {}
+            for name in instance_names: groups.setdefault(self.mod_target(name), []).append(name)
+
+            targets = []    # (instance, project_id, remote file)
+            for (loader_filter, version), names in groups.items():
+                for pid in project_ids:
+                    wanted = [n for n in names if (pid in installed[n]) == (action == "Update")]
+                    skipped += [f"{pid} ({n}): {'already installed' if action == 'Install' else 'not installed'}" for n in names if n not in wanted]
+                    if not wanted: continue
+                    if not version:
+                        failed += [f"{pid} ({n}): unknown Minecraft version" for n in wanted]
+                        continue
+                    if callback: callback['setStatus'](f"Resolving {pid} for {loader_filter} {version}...")
+                    try: remote = self.modrinth.get_latest_version_file(pid, [loader_filter], [version])
+                    except ModrinthError as e:
+                        failed += [f"{pid} ({n}): {e}" for n in wanted]
+                        continue
+                    if not remote:
+                        failed += [f"{pid} ({n}): no compatible version" for n in wanted]
+                        continue
+                    targets += [(n, pid, remote) for n in wanted]
+
+            # Each unique file is downloaded once into a temp dir of our own, then linked into every mods folder
+            run_dir = TEMP_DIR / f"bulk-{uuid.uuid4().hex[:8]}"
+            try:
+                unique = {}
+                for _, _, remote in targets:
+                    sha1 = remote.get('hashes', {}).get('sha1')
+                    key = sha1 or remote['url']
+                    unique.setdefault(key, {"url": remote['url'], "sha1": sha1, "size": remote.get('size'),
+                                            "path": run_dir / hashlib.sha1(key.encode()).hexdigest()[:16] / remote['filename']})
+                # A failed download only fails the instances that needed that file
+                try:
+                    if unique: self.installer.fetch(list(unique.values()), callback)
+                except Exception as e: print(f"Bulk download: {e}")
+
+                if callback:
+                    callback['setStatus']("Copying into instances...")
+                    callback['setMax'](max(len(targets), 1))
+                for i, (name, pid, remote) in enumerate(targets, 1):
+                    sha1 = remote.get('hashes', {}).get('sha1')
+                    src = unique[sha1 or remote['url']]["path"]
+                    old = installed[name].get(pid, [])
+                    # Updating a disabled mod keeps it disabled
+                    disabled = any(p.name.endswith(".disabled") for p in old)
+                    dst = BASE_DIR / name / ".minecraft/mods" / (remote['filename'] + (".disabled" if disabled else ""))
+                    try:
+                        if sha1 and any(file_sha1(p) == sha1 for p in old):
+                            skipped.append(f"{remote['filename']} ({name}): up to date")
+                        elif not src.is_file():
+                            failed.append(f"{remote['filename']} ({name}): download failed")
+                        else:
+                            for p in old: os.remove(p)
+                            link_or_copy(src, dst)
+                            touched.add(name)
+                            done += 1
+                    except Exception as e: failed.append(f"{remote['filename']} ({name}): {e}")
+                    if callback: callback['setProgress'](i)
+            finally:
+                shutil.rmtree(run_dir, ignore_errors=True)
+        else:
+            paths = [(name, p) for name in instance_names for pid in project_ids for p in installed[name].get(pid, [])]
+            if callback:
+                callback['setStatus'](f"{action} {len(paths)} files...")
+                callback['setMax'](max(len(paths), 1))
+            for i, (name, p) in enumerate(paths, 1):
+                is_disabled = p.name.endswith(".disabled")
+                if action == "Remove": ok = self.delete_mod(p)
+                elif (action == "Enable") == is_disabled: ok = self.toggle_mod(p)
+                else:
+                    skipped.append(f"{p.name} ({name}): already {action.lower()}d")
+                    ok = None
+                if ok: done += 1; touched.add(name)
+                elif ok is False: failed.append(f"{p.name} ({name})")
+                if callback: callback['setProgress'](i)
+
+        if self.watched_instance() in touched: self.notify_mods_changed()
+        msg = f"{action}: {done} changed, {len(skipped)} skipped, {len(failed)} failed."
+        if failed: msg += "\n" + "\n".join(failed[:10])
+        return not failed, msg
+
 # --- UI COMPONENTS ---
 class ProgressDialog(ctk.CTkToplevel):
     def __init__(self, parent, title="Processing..."):
@@ -484,6 +1909,9 @@ class App(ctk.CTk):
 
         self.backend = Backend()
         self.current_inst = None
+        self.mods = {}          # filename -> mod entry for the current instance
+        self.mod_rows = {}      # filename -> row widget in My Mods
+        self.bulk_selection = {}    # project_id -> title, picked in Get Mods for bulk operations
         
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -493,6 +1921,7 @@ class App(ctk.CTk):
         self.sidebar.grid(row=0, column=0, sticky="nsew")
         ctk.CTkLabel(self.sidebar, text="INSTANCES", font=("Arial", 18, "bold")).pack(pady=(20,10))
         ctk.CTkButton(self.sidebar, text="+ New Instance", command=self.dialog_create).pack(pady=5)
+        ctk.CTkButton(self.sidebar, text="Import Lockfile", fg_color="#555", command=self.dialog_import_lock).pack(pady=5)
         self.inst_list = ctk.CTkScrollableFrame(self.sidebar)
         self.inst_list.pack(fill="both", expand=True, padx=5, pady=10)
         
@@ -517,6 +1946,8 @@ class App(ctk.CTk):
         self.header_btns.pack(side="right")
         self.btn_delete = ctk.CTkButton(self.header_btns, text="DELETE", font=("Arial", 14, "bold"), fg_color="#C0392B", width=100, height=40, state="disabled", command=self.confirm_delete)
         self.btn_delete.pack(side="left", padx=10)
+        self.btn_export = ctk.CTkButton(self.header_btns, text="EXPORT", font=("Arial", 14, "bold"), fg_color="#555", width=100, height=40, state="disabled", command=self.export_lock)
+        self.btn_export.pack(side="left", padx=(0, 10))
         self.btn_play = ctk.CTkButton(self.header_btns, text="PLAY", font=("Arial", 18, "bold"), fg_color="green", width=150, height=40, state="disabled", command=self.launch)
         self.btn_play.pack(side="left")
 
@@ -525,15 +1956,18 @@ class App(ctk.CTk):
         self.tab_mods = self.tabs.add("My Mods")
         self.tab_getmods = self.tabs.add("Get Mods")
         self.tab_packs = self.tabs.add("Get Modpacks")
+        self.tab_perf = self.tabs.add("Performance")
         
         self._setup_mymods()
         self._setup_getmods()
         self._setup_getpacks()
+        self._setup_perf()
         self.refresh_instances()
 
     def _setup_mymods(self):
         self.mymods_scroll = ctk.CTkScrollableFrame(self.tab_mods)
         self.mymods_scroll.pack(fill="both", expand=True)
+        self.lbl_nomods = None
 
     def _setup_getmods(self):
         frame = ctk.CTkFrame(self.tab_getmods, fg_color="transparent")
@@ -541,6 +1975,7 @@ class App(ctk.CTk):
         self.entry_mod = ctk.CTkEntry(frame, placeholder_text="Search Mods...")
         self.entry_mod.pack(side="left", fill="x", expand=True, padx=(0,5))
         self.entry_mod.bind("<Return>", lambda e: self.search_store("mod"))
+        ctk.CTkButton(frame, text="Bulk...", width=80, fg_color="#555", command=self.dialog_bulk).pack(side="right", padx=(5,0))
         ctk.CTkButton(frame, text="Search", width=80, command=lambda: self.search_store("mod")).pack(side="right")
         self.store_mod_scroll = ctk.CTkScrollableFrame(self.tab_getmods)
         self.store_mod_scroll.pack(fill="both", expand=True)
@@ -555,6 +1990,43 @@ class App(ctk.CTk):
         self.store_pack_scroll = ctk.CTkScrollableFrame(self.tab_packs)
         self.store_pack_scroll.pack(fill="both", expand=True)
 
+    def _setup_perf(self):
+        self.perf_scroll = ctk.CTkScrollableFrame(self.tab_perf)
+        self.perf_scroll.pack(fill="both", expand=True)
+
+    def render_perf(self):
+        for w in self.perf_scroll.winfo_children(): w.destroy()
+        if not self.current_inst: return
+        name = self.current_inst
+        sessions = self.backend.get_telemetry(name)
+        jvm = self.backend.get_instance_config(name).get("jvm")
+
+        ctk.CTkLabel(self.perf_scroll, text="Current JVM Settings", font=("Arial", 14, "bold")).pack(anchor="w", padx=10, pady=(10, 0))
+        current = f"{jvm['heap_gb']} GB heap, {jvm['gc_profile']} GC (instance override)" if jvm else "Using launcher settings"
+        ctk.CTkLabel(self.perf_scroll, text=current, text_color="gray").pack(anchor="w", padx=10)
+
+        ctk.CTkLabel(self.perf_scroll, text="Last Session", font=("Arial", 14, "bold")).pack(anchor="w", padx=10, pady=(15, 0))
+        if sessions:
+            s = sessions[-1]
+            lines = [
+                f"Played {s['duration_s'] / 60:.0f} min with {s['heap_gb']} GB, {s['gc_profile']} GC, {s['mod_count']} mods",
+                f"GC pauses: p50 {s['pause_p50_ms']} ms, p99 {s['pause_p99_ms']} ms, max {s['pause_max_ms']} ms ({s['gc_count']} total, {s['full_gc_count']} full)",
+                f"Time in GC: {s['gc_time_pct']}%   Allocation: {s['alloc_rate_mb_s']} MB/s",
+                f"Peak heap: {s['peak_heap_mb']} MB used, {s['peak_live_mb']} MB live, {s['heap_capacity_mb']} MB committed",
+            ]
+            for line in lines: ctk.CTkLabel(self.perf_scroll, text=line, anchor="w").pack(anchor="w", padx=10)
+        else:
+            ctk.CTkLabel(self.perf_scroll, text="No data yet. Turn on GC telemetry in Launcher Settings and play a session.", text_color="gray").pack(anchor="w", padx=10)
+
+        rec = self.backend.recommend_jvm(name)
+        ctk.CTkLabel(self.perf_scroll, text="Recommendation", font=("Arial", 14, "bold")).pack(anchor="w", padx=10, pady=(15, 0))
+        ctk.CTkLabel(self.perf_scroll, text=f"{rec['heap_gb']} GB heap, {rec['gc_profile']} GC", anchor="w").pack(anchor="w", padx=10)
+        ctk.CTkLabel(self.perf_scroll, text="; ".join(rec['reasons']), text_color="gray", anchor="w").pack(anchor="w", padx=10)
+        btns = ctk.CTkFrame(self.perf_scroll, fg_color="transparent")
+        btns.pack(anchor="w", padx=10, pady=10)
+        ctk.CTkButton(btns, text="Apply", width=80, fg_color="green", command=lambda: [self.backend.apply_jvm_settings(name, rec), self.render_perf()]).pack(side="left", padx=(0, 5))
+        ctk.CTkButton(btns, text="Reset", width=80, fg_color="#555", command=lambda: [self.backend.apply_jvm_settings(name, None), self.render_perf()]).pack(side="left")
+
     def refresh_instances(self):
         for w in self.inst_list.winfo_children(): w.destroy()
         for i in self.backend.get_instances():
@@ -565,37 +2037,122 @@ class App(ctk.CTk):
         self.lbl_title.configure(text=name)
         self.btn_play.configure(state="normal")
         self.btn_delete.configure(state="normal")
-        threading.Thread(target=self.refresh_mymods_async, daemon=True).start()
+        self.btn_export.configure(state="normal")
+        self.render_perf()
+        threading.Thread(target=lambda: self.refresh_mymods_async(name), daemon=True).start()
 
     def confirm_delete(self):
         if not self.current_inst: return
         answer = messagebox.askyesno("Delete", f"Delete '{self.current_inst}'?")
         if answer:
+            self.backend.stop_watching_mods()
             self.backend.delete_instance(self.current_inst)
             self.current_inst = None
             self.lbl_title.configure(text="Select Instance")
             self.btn_play.configure(state="disabled")
             self.btn_delete.configure(state="disabled")
+            self.btn_export.configure(state="disabled")
             for w in self.mymods_scroll.winfo_children(): w.destroy()
+            for w in self.perf_scroll.winfo_children(): w.destroy()
+            self.mods, self.mod_rows, self.lbl_nomods = {}, {}, None
             self.refresh_instances()
 
-    def refresh_mymods_async(self):
-        mods = self.backend.get_mods(self.current_inst)
-        self.after(0, lambda: self.render_mymods(mods))
+    def export_lock(self):
+        if not self.current_inst: return
+        path = filedialog.asksaveasfilename(defaultextension=".lock.json", initialfile=f"{self.current_inst}.lock.json",
+                                            filetypes=[("IbraMod Lockfile", "*.lock.json"), ("JSON", "*.json")])
+        if not path: return
+        name = self.current_inst
+        def task():
+            res, msg = self.backend.export_lockfile(name, path)
+            self.after(0, lambda: (messagebox.showinfo if res else messagebox.showerror)("Export", msg))
+        threading.Thread(target=task).start()
+
+    def dialog_import_lock(self):
+        path = filedialog.askopenfilename(filetypes=[("IbraMod Lockfile", "*.lock.json"), ("JSON", "*.json")])
+        if not path: return
+        try: default_name = json.loads(Path(path).read_text()).get("name", "")
+        except: default_name = ""
+        name = ctk.CTkInputDialog(text=f"Install as (default: {default_name}):", title="Import Lockfile").get_input()
+        if name is None: return
+        name = name or default_name
+        if not name: return messagebox.showerror("Error", "Please enter a name")
+        prog = ProgressDialog(self, title=f"Installing {name}...")
+        prog.protocol("WM_DELETE_WINDOW", lambda: None)
+        callback = {
+            "setStatus": lambda text: self.after(0, lambda: prog.update_status(text)),
+            "setProgress": lambda val: self.after(0, lambda: prog.update_progress(val)),
+            "setMax": lambda val: self.after(0, lambda: prog.set_max(val))
+        }
+        def task():
+            res, msg = self.backend.install_from_lockfile(path, name, callback)
+            self.after(0, prog.destroy)
+            if res:
+                self.after(0, lambda: messagebox.showinfo("Success", msg))
+                self.after(0, self.refresh_instances)
+            else:
+                self.after(0, lambda: messagebox.showerror("Error", msg))
+        threading.Thread(target=task).start()
 
-    def render_mymods(self, mods):
+    def refresh_mymods_async(self, name):
+        # Full scan only happens when an instance is opened, after that the watcher keeps us in sync
+        watcher = self.backend.create_mod_watcher(name, lambda kind, fn, old: self.on_mod_event(name, kind, fn, old))
+        mods = self.backend.get_mods(name)
+        self.after(0, lambda: self.render_mymods(name, mods, watcher))
+
+    def render_mymods(self, name, mods, watcher):
+        # A slower scan for a previously clicked instance must not replace the current watcher
+        if name != self.current_inst: return
+        self.backend.watch_mods(watcher)
         for w in self.mymods_scroll.winfo_children(): w.destroy()
-        if not mods: ctk.CTkLabel(self.mymods_scroll, text="No mods installed.").pack(pady=20); return
-        for m in mods:
-            row = ctk.CTkFrame(self.mymods_scroll)
-            row.pack(fill="x", pady=2)
-            info = ctk.CTkFrame(row, fg_color="transparent")
-            info.pack(side="left", padx=10)
-            ctk.CTkLabel(info, text=m['name'], font=("Arial", 14, "bold")).pack(anchor="w")
-            ctk.CTkLabel(info, text=m['filename'], font=("Arial", 10), text_color="gray").pack(anchor="w")
-            ctk.CTkButton(row, text="X", width=30, fg_color="#C0392B", command=lambda p=m['path']: [self.backend.delete_mod(p), self.load_instance(self.current_inst)]).pack(side="right", padx=5)
-            state_text, col = ("Enable", "green") if m['disabled'] else ("Disable", "#444")
-            ctk.CTkButton(row, text=state_text, width=60, fg_color=col, command=lambda p=m['path']: [self.backend.toggle_mod(p), self.load_instance(self.current_inst)]).pack(side="right", padx=5)
+        self.mods = {m['filename']: m for m in mods}
+        self.mod_rows = {}
+        self.lbl_nomods = None
+        for m in mods: self.add_mod_row(m)
+        self.update_nomods_label()
+
+    def on_mod_event(self, name, kind, filename, old_filename):
+        # Runs on the watcher thread, so read the jar here and only touch widgets in after()
+        entry = None
+        if kind in ("add", "rename", "change"):
+            try: entry = self.backend.get_mod_entry(BASE_DIR / name / ".minecraft/mods" / filename)
+            except OSError: return
+        self.after(0, lambda: self.apply_mod_event(name, kind, filename, old_filename, entry))
+
+    def apply_mod_event(self, name, kind, filename, old_filename, entry):
+        if name != self.current_inst: return
+        for fn in (filename, old_filename):
+            if fn and fn in self.mod_rows:
+                self.mod_rows.pop(fn).destroy()
+                self.mods.pop(fn, None)
+        if entry:
+            self.mods[filename] = entry
+            self.add_mod_row(entry)
+        self.update_nomods_label()
+
+    def update_nomods_label(self):
+        if not self.mods and not self.lbl_nomods:
+            self.lbl_nomods = ctk.CTkLabel(self.mymods_scroll, text="No mods installed.")
+            self.lbl_nomods.pack(pady=20)
+        elif self.mods and self.lbl_nomods:
+            self.lbl_nomods.destroy()
+            self.lbl_nomods = None
+
+    def add_mod_row(self, m):
+        row = ctk.CTkFrame(self.mymods_scroll)
+        # Keep the list sorted by inserting before the first row that sorts after this one
+        key = m['name'].lower()
+        after_rows = sorted((e['name'].lower(), fn) for fn, e in self.mods.items() if fn in self.mod_rows and e['name'].lower() > key)
+        if after_rows: row.pack(fill="x", pady=2, before=self.mod_rows[after_rows[0][1]])
+        else: row.pack(fill="x", pady=2)
+        info = ctk.CTkFrame(row, fg_color="transparent")
+        info.pack(side="left", padx=10)
+        ctk.CTkLabel(info, text=m['name'], font=("Arial", 14, "bold")).pack(anchor="w")
+        ctk.CTkLabel(info, text=m['filename'], font=("Arial", 10), text_color="gray").pack(anchor="w")
+        ctk.CTkButton(row, text="X", width=30, fg_color="#C0392B", command=lambda p=m['path']: self.backend.delete_mod(p)).pack(side="right", padx=5)
+        state_text, col = ("Enable", "green") if m['disabled'] else ("Disable", "#444")
+        ctk.CTkButton(row, text=state_text, width=60, fg_color=col, command=lambda p=m['path']: self.backend.toggle_mod(p)).pack(side="right", padx=5)
+        self.mod_rows[m['filename']] = row
 
     def launch(self):
         user = self.entry_user.get()
@@ -605,6 +2162,7 @@ class App(ctk.CTk):
             def run():
                 self.backend.launch(self.current_inst, user)
                 self.after(0, lambda: self.btn_play.configure(text="PLAY", state="normal", fg_color="green"))
+                self.after(0, self.render_perf)
             threading.Thread(target=run).start()
 
     def search_store(self, stype):
@@ -618,22 +2176,28 @@ class App(ctk.CTk):
             config = self.backend.get_instance_config(self.current_inst)
             ver, loader = config.get('version'), config.get('loader')
         def task():
-            hits = self.backend.modrinth.search(query, facet_type=stype, version=ver, loader=loader)
-            self.after(0, lambda: self.render_results(hits, stype, scroll))
+            try: hits, error = self.backend.modrinth.search(query, facet_type=stype, version=ver, loader=loader), None
+            except ModrinthError as e: hits, error = [], str(e)
+            self.after(0, lambda: self.render_results(hits, stype, scroll, error))
         threading.Thread(target=task).start()
 
-    def render_results(self, hits, stype, scroll):
+    def render_results(self, hits, stype, scroll, error=None):
         for w in scroll.winfo_children(): w.destroy()
+        if error: ctk.CTkLabel(scroll, text=error, text_color="#E74C3C").pack(pady=20); return
         if not hits: ctk.CTkLabel(scroll, text="No results.").pack(pady=20); return
         installed = set()
         if stype == "mod" and self.current_inst: 
-            installed = {m['name'].strip().lower() for m in self.backend.get_mods(self.current_inst)}
+            installed = {m['name'].strip().lower() for m in self.mods.values()}
         for hit in hits:
             row = ctk.CTkFrame(scroll)
             row.pack(fill="x", pady=5)
+            title = hit['title']
+            if stype == "mod":
+                var_sel = ctk.BooleanVar(value=hit['project_id'] in self.bulk_selection)
+                ctk.CTkCheckBox(row, text="", width=20, variable=var_sel,
+                                command=lambda pid=hit['project_id'], t=title, v=var_sel: self.toggle_bulk_selection(pid, t, v.get())).pack(side="left", padx=(10, 0))
             info = ctk.CTkFrame(row, fg_color="transparent")
             info.pack(side="left", fill="x", expand=True, padx=10)
-            title = hit['title']
             ctk.CTkLabel(info, text=title, font=("Arial", 14, "bold"), anchor="w").pack(fill="x")
             ctk.CTkLabel(info, text=(hit['description'] or "")[:80]+"...", text_color="gray", anchor="w").pack(fill="x")
             if stype == "mod":
@@ -657,12 +2221,52 @@ class App(ctk.CTk):
             res, msg = self.backend.install_mod_from_store(pid, self.current_inst, callback)
             self.after(0, prog.destroy)
             if res:
-                self.after(0, lambda: self.load_instance(self.current_inst)) 
+                # The mods watcher adds the new row, only the store list needs refreshing
                 self.after(0, lambda: self.search_store("mod"))
             else:
                 self.after(0, lambda: messagebox.showerror("Error", msg))
         threading.Thread(target=task).start()
 
+    def toggle_bulk_selection(self, pid, title, selected):
+        if selected: self.bulk_selection[pid] = title
+        else: self.bulk_selection.pop(pid, None)
+
+    def dialog_bulk(self):
+        if not self.bulk_selection: return messagebox.showerror("Error", "Tick some mods in the search results first!")
+        d = ctk.CTkToplevel(self)
+        d.geometry("350x500")
+        d.title("Bulk Operation")
+        ctk.CTkLabel(d, text="Mods", font=("Arial", 14, "bold")).pack(pady=(10, 0))
+        ctk.CTkLabel(d, text="\n".join(self.bulk_selection.values()), text_color="gray", wraplength=300).pack(pady=5)
+        ctk.CTkLabel(d, text="Instances", font=("Arial", 14, "bold")).pack(pady=(10, 0))
+        inst_scroll = ctk.CTkScrollableFrame(d, height=200)
+        inst_scroll.pack(fill="x", padx=20, pady=5)
+        inst_vars = {}
+        for i in self.backend.get_instances():
+            inst_vars[i] = ctk.BooleanVar(value=(i == self.current_inst))
+            ctk.CTkCheckBox(inst_scroll, text=i, variable=inst_vars[i]).pack(anchor="w", pady=2)
+        action_var = ctk.StringVar(value="Install")
+        ctk.CTkOptionMenu(d, values=Backend.BULK_ACTIONS, variable=action_var).pack(pady=10)
+        def run():
+            targets = [i for i, v in inst_vars.items() if v.get()]
+            if not targets: return messagebox.showerror("Error", "Select at least one instance")
+            action, pids = action_var.get(), list(self.bulk_selection)
+            d.destroy()
+            prog = ProgressDialog(self, title=f"{action} {len(pids)} mods in {len(targets)} instances")
+            prog.protocol("WM_DELETE_WINDOW", lambda: None)
+            callback = {
+                "setStatus": lambda text: self.after(0, lambda: prog.update_status(text)),
+                "setProgress": lambda val: self.after(0, lambda: prog.update_progress(val)),
+                "setMax": lambda val: self.after(0, lambda: prog.set_max(val))
+            }
+            def task():
+                try: res, msg = self.backend.bulk_operation(action, pids, targets, callback)
+                except Exception as e: res, msg = False, str(e)
+                self.after(0, prog.destroy)
+                self.after(0, lambda: (messagebox.showinfo if res else messagebox.showerror)("Bulk Operation", msg))
+            threading.Thread(target=task).start()
+        ctk.CTkButton(d, text="Run", command=run).pack(pady=10)
+
     def install_pack_dialog(self, pid, title):
         d = ctk.CTkToplevel(self)
         d.geometry("300x150")
@@ -691,13 +2295,15 @@ class App(ctk.CTk):
         else: self.populate_versions(scroll, pid, name, versions, top)
 
     def fetch_versions_async(self, pid, name, top, scroll, lbl):
-        versions = self.backend.modrinth.get_project_versions(pid)
-        self.after(0, lambda: self.update_version_list(top, scroll, lbl, pid, name, versions))
+        try: versions, error = self.backend.modrinth.get_project_versions(pid), None
+        except ModrinthError as e: versions, error = [], str(e)
+        self.after(0, lambda: self.update_version_list(top, scroll, lbl, pid, name, versions, error))
 
-    def update_version_list(self, top, scroll, lbl, pid, name, versions):
+    def update_version_list(self, top, scroll, lbl, pid, name, versions, error=None):
         if not top.winfo_exists(): return 
         lbl.destroy()
-        if not versions: ctk.CTkLabel(scroll, text="No versions found.").pack(pady=20)
+        if error: ctk.CTkLabel(scroll, text=error, text_color="#E74C3C", wraplength=340).pack(pady=20)
+        elif not versions: ctk.CTkLabel(scroll, text="No versions found.").pack(pady=20)
         else: self.populate_versions(scroll, pid, name, versions, top)
 
     def populate_versions(self, scroll, pid, name, versions, top):
@@ -726,7 +2332,7 @@ class App(ctk.CTk):
 
     def dialog_settings(self):
         d = ctk.CTkToplevel(self)
-        d.geometry("450x450")
+        d.geometry("450x780")
         d.title("Settings")
         
         settings = self.backend.get_settings()
@@ -744,6 +2350,12 @@ class App(ctk.CTk):
         var_lowend = ctk.BooleanVar(value=settings['low_end_mode'])
         sw_lowend = ctk.CTkSwitch(d, text="Low End PC Mode (FPS Boost)", variable=var_lowend)
         sw_lowend.pack(pady=5)
+        var_offline = ctk.BooleanVar(value=settings.get('offline_mode', False))
+        ctk.CTkSwitch(d, text="Offline Mode (install from local cache)", variable=var_offline).pack(pady=5)
+        var_telemetry = ctk.BooleanVar(value=settings.get('gc_telemetry', False))
+        ctk.CTkSwitch(d, text="Record GC telemetry while playing", variable=var_telemetry).pack(pady=5)
+        var_autotune = ctk.BooleanVar(value=settings.get('auto_tune', False))
+        ctk.CTkSwitch(d, text="Auto-tune heap and GC per instance", variable=var_autotune).pack(pady=5)
         
         # Java Path
         ctk.CTkLabel(d, text="Java Executable", font=("Arial", 14, "bold")).pack(pady=(20, 5))
@@ -753,17 +2365,33 @@ class App(ctk.CTk):
         combo_java.pack(pady=5)
         ctk.CTkLabel(d, text="Set to 'Auto' to let IbraMod pick Java 8/17/21 automatically.", text_color="gray", font=("Arial", 10)).pack()
 
+        # LAN Cache
+        ctk.CTkLabel(d, text="LAN Cache", font=("Arial", 14, "bold")).pack(pady=(20, 5))
+        entry_lan = ctk.CTkEntry(d, width=300, placeholder_text="http://192.168.1.5:25585")
+        if settings.get("lan_cache_url"): entry_lan.insert(0, settings["lan_cache_url"])
+        entry_lan.pack(pady=5)
+        var_lan_server = ctk.BooleanVar(value=settings.get("lan_cache_server", False))
+        port = settings.get("lan_cache_port", 25585)
+        ctk.CTkSwitch(d, text=f"Share downloads with this network (port {port})", variable=var_lan_server).pack(pady=5)
+
         def save():
-            new_data = {
+            new_data = dict(settings)
+            new_data.update({
                 "max_ram": int(slider_ram.get()),
                 "low_end_mode": var_lowend.get(),
+                "offline_mode": var_offline.get(),
+                "gc_telemetry": var_telemetry.get(),
+                "auto_tune": var_autotune.get(),
+                "lan_cache_url": entry_lan.get().strip(),
+                "lan_cache_server": var_lan_server.get(),
                 "java_path": combo_java.get()
-            }
+            })
             self.backend.save_settings(new_data)
             messagebox.showinfo("Saved", "Settings Updated!")
             d.destroy()
             
-        ctk.CTkButton(d, text="Save Settings", command=save, fg_color="green").pack(pady=30)
+        ctk.CTkButton(d, text="Save Settings", command=save, fg_color="green").pack(pady=(30, 10))
+        ctk.CTkLabel(d, text=self.backend.modrinth.stats_summary(), text_color="gray", font=("Arial", 10)).pack()
 
     def dialog_create(self):
         d = ctk.CTkToplevel(self)
@@ -775,14 +2403,30 @@ class App(ctk.CTk):
         ctk.CTkLabel(d, text="Game Version").pack(pady=(10,0))
         ver_frame = ctk.CTkFrame(d, fg_color="transparent")
         ver_frame.pack(fill="x", padx=40)
-        ev = ctk.CTkEntry(ver_frame)
+        # Versions come from the on-disk manifest cache, so this is instant after the first run.
+        # On a cold cache the list fills in once the background refresh lands.
+        def on_manifest(key):
+            if key != "mojang": return
+            versions = self.backend.manifests.mc_versions(block=False)[:100]
+            def done():
+                if d.winfo_exists() and versions: ev.configure(values=versions)
+            self.after(0, done)
+        self.backend.manifests.on_update(on_manifest)
+        d.bind("<Destroy>", lambda e: e.widget is d and self.backend.manifests.remove_listener(on_manifest))
+        ev = ctk.CTkComboBox(ver_frame, values=self.backend.manifests.mc_versions(block=False)[:100] or ["1.20.1"])
         ev.pack(side="left", fill="x", expand=True)
-        ev.insert(0, "1.20.1")
+        ev.set("1.20.1")
         def fetch_latest():
             btn_latest.configure(text="Fetching...", state="disabled")
             def run():
                 latest = self.backend.get_latest_mc_version()
-                self.after(0, lambda: [ev.delete(0, 'end'), ev.insert(0, latest if latest else "Error"), btn_latest.configure(text="Get Latest", state="normal")])
+                versions = self.backend.manifests.mc_versions()[:100]
+                def done():
+                    if not d.winfo_exists(): return
+                    if versions: ev.configure(values=versions)
+                    ev.set(latest if latest else "Error")
+                    btn_latest.configure(text="Get Latest", state="normal")
+                self.after(0, done)
             threading.Thread(target=run).start()
         btn_latest = ctk.CTkButton(ver_frame, text="Get Latest", width=80, command=fetch_latest)
         btn_latest.pack(side="right", padx=(5,0))
@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# IbraMod.py is a single script at the repo root, not an installed package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(autouse=True)
+def isolated_dirs(tmp_path, monkeypatch):
+    """Points every ROOT_DIR-derived path at tmp_path so tests never write into the checkout."""
+    mod = sys.modules.get("IbraMod")
+    if mod is None: return
+    for name in ("BASE_DIR", "CACHE_FILE", "SETTINGS_FILE", "TEMP_DIR", "MANIFEST_DIR", "ARTIFACT_DIR", "LAN_CACHE_DIR"):
+        monkeypatch.setattr(mod, name, tmp_path / "root" / getattr(mod, name).name)
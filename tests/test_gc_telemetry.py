@@ -0,0 +1,96 @@
+"""GcLogParser/GcLogMonitor math and recommend_jvm's sizing rules, on canned G1 logs."""
+import json
+
+import pytest
+
+pytest.importorskip("customtkinter")
+pytest.importorskip("minecraft_launcher_lib")
+import IbraMod  # noqa: E402
+
+G1_LOG = """\
+[0.010s][info][gc] Using G1
+[0.020s][info][gc,init] Heap Region Size: 2M
+[1.000s][info][gc,start    ] GC(0) Pause Young (Normal) (G1 Evacuation Pause)
+[1.005s][info][gc          ] GC(0) Pause Young (Normal) (G1 Evacuation Pause) 100M->20M(512M) 5.000ms
+[2.000s][info][gc] GC(1) Pause Young (Normal) (G1 Evacuation Pause) 220M->60M(512M) 10.5ms
+[3.000s][info][gc] GC(2) Pause Full (System.gc()) 1G->300M(1G) 200.0ms
+[11.000s][info][gc,heap,exit] Heap
+"""
+
+
+def parse(text):
+    p = IbraMod.GcLogParser()
+    for line in text.splitlines(): p.feed(line)
+    return p.metrics()
+
+
+def test_parser_metrics():
+    m = parse(G1_LOG)
+    assert m["gc_count"] == 3 and m["full_gc_count"] == 1
+    assert m["duration_s"] == 11.0                      # 0.010s .. 11.000s
+    assert (m["pause_p50_ms"], m["pause_p99_ms"], m["pause_max_ms"]) == (10.5, 200.0, 200.0)
+    assert m["gc_time_ms"] == 215.5 and m["gc_time_pct"] == 1.96
+    # 100M before the first GC, then +200M (20->220) and +964M (60->1024)
+    assert m["alloc_rate_mb_s"] == round(1264 / 10.99, 1)
+    assert (m["peak_heap_mb"], m["peak_live_mb"], m["heap_capacity_mb"]) == (1024, 300, 1024)
+
+
+def test_parser_kilobyte_units_and_empty_log():
+    m = parse("[1.0s][info][gc] GC(0) Pause Young (Normal) (G1 Evacuation Pause) 2048K->1024K(4096K) 1.0ms")
+    assert (m["peak_heap_mb"], m["peak_live_mb"], m["heap_capacity_mb"]) == (2, 1, 4)
+    assert parse("")["pause_p99_ms"] == 0.0 and parse("")["gc_time_pct"] == 0.0
+
+
+def test_monitor_handles_partial_lines_and_rotation(tmp_path):
+    log = tmp_path / "gc.log"
+    log.write_text(G1_LOG[:150])
+    mon = IbraMod.GcLogMonitor(log)
+    mon._read()
+    log.write_text(G1_LOG)
+    mon._read()
+    assert mon.parser.metrics() == parse(G1_LOG)
+
+    # A rotated file starts over smaller than what we've already read
+    log.write_text("[12.000s][info][gc] GC(3) Pause Young (Normal) (G1 Evacuation Pause) 400M->100M(1G) 7.0ms\n")
+    m = mon.stop()
+    assert m["gc_count"] == 4 and m["pause_max_ms"] == 200.0 and m["peak_live_mb"] == 300
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    # Skip __init__, it talks to the network
+    b = IbraMod.Backend.__new__(IbraMod.Backend)
+    (IbraMod.BASE_DIR / "inst" / ".minecraft" / "mods").mkdir(parents=True)
+    monkeypatch.setattr(IbraMod, "get_system_ram_gb", lambda: 32)
+    return b
+
+
+def session(backend, **metrics):
+    (IbraMod.BASE_DIR / "inst" / "telemetry.json").write_text(json.dumps({"sessions": [metrics]}))
+
+
+def test_recommend_without_telemetry_uses_mod_count(backend):
+    assert backend.recommend_jvm("inst")["heap_gb"] == 2
+    for i in range(60): (IbraMod.BASE_DIR / "inst" / ".minecraft" / "mods" / f"m{i}.jar").touch()
+    rec = backend.recommend_jvm("inst")
+    assert (rec["heap_gb"], rec["gc_profile"]) == (6, "g1_tuned")     # 51-150 mods
+
+
+def test_recommend_sizes_heap_from_live_set(backend):
+    session(backend, peak_live_mb=3072, full_gc_count=0, pause_p99_ms=20, gc_time_pct=1, heap_gb=4)
+    rec = backend.recommend_jvm("inst")
+    assert (rec["heap_gb"], rec["gc_profile"]) == (8, "default")    # ceil(3 GB * 2.5)
+
+
+def test_recommend_grows_heap_after_full_gcs(backend):
+    session(backend, peak_live_mb=1024, full_gc_count=2, pause_p99_ms=20, gc_time_pct=1, heap_gb=8)
+    rec = backend.recommend_jvm("inst")
+    assert (rec["heap_gb"], rec["gc_profile"]) == (10, "g1_tuned")
+
+
+def test_recommend_caps_for_small_machines(backend, monkeypatch):
+    monkeypatch.setattr(IbraMod, "get_system_ram_gb", lambda: 6)
+    session(backend, peak_live_mb=4096, full_gc_count=0, pause_p99_ms=5, gc_time_pct=0.5, heap_gb=4)
+    rec = backend.recommend_jvm("inst")
+    assert (rec["heap_gb"], rec["gc_profile"]) == (3, "g1_tuned")
+    assert any("capped" in r for r in rec["reasons"])
@@ -0,0 +1,111 @@
+"""Runs LanCacheServer against a local stand-in upstream (port=0, 127.0.0.1 only)."""
+import functools
+import hashlib
+import http.server
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+pytest.importorskip("customtkinter")
+pytest.importorskip("minecraft_launcher_lib")
+import IbraMod  # noqa: E402
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    root = tmp_path / "upstream"
+    root.mkdir()
+    hits = []
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            super().do_GET()
+        def log_message(self, *args): pass
+
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=str(root)))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield root, f"http/127.0.0.1:{httpd.server_address[1]}", hits
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    server = IbraMod.LanCacheServer(port=0, cache_dir=tmp_path / "cache", allowed_hosts={"127.0.0.1"}, bind="127.0.0.1").start()
+    yield server, f"http://127.0.0.1:{server.port}"
+    server.stop()
+
+
+def put(root, name, data):
+    (root / name).write_bytes(data)
+    return hashlib.sha1(data).hexdigest()
+
+
+def test_concurrent_misses_hit_upstream_once(upstream, cache):
+    root, prefix, hits = upstream
+    server, base = cache
+    sha1 = put(root, "lib.jar", b"x" * 200000)
+
+    url = f"{base}/{prefix}/lib.jar?_sha1={sha1}"
+    with ThreadPoolExecutor(8) as pool:
+        bodies = list(pool.map(lambda _: requests.get(url, timeout=10).content, range(8)))
+
+    assert all(hashlib.sha1(b).hexdigest() == sha1 for b in bodies)
+    assert hits == ["/lib.jar"]
+    assert server.stats["misses"] == 1 and server.stats["hits"] == 7
+
+
+def test_wrong_sha1_is_not_cached(upstream, cache):
+    root, prefix, hits = upstream
+    server, base = cache
+    put(root, "lib.jar", b"tampered")
+
+    r = requests.get(f"{base}/{prefix}/lib.jar?_sha1={'0' * 40}", timeout=10)
+    assert r.status_code == 502
+    assert not any(p.is_file() for p in server.cache_dir.rglob("*"))
+
+
+def test_bad_entry_is_evicted_and_refetched(upstream, cache):
+    root, prefix, hits = upstream
+    server, base = cache
+    put(root, "lib.jar", b"old")
+    requests.get(f"{base}/{prefix}/lib.jar", timeout=10)  # cached without a hash
+
+    sha1 = put(root, "lib.jar", b"new")
+    r = requests.get(f"{base}/{prefix}/lib.jar?_sha1={sha1}", timeout=10)
+    assert r.content == b"new"
+    assert server.stats["evicted"] == 1 and len(hits) == 2
+
+
+def test_sha1_param_is_not_forwarded(upstream, cache):
+    root, prefix, hits = upstream
+    _, base = cache
+    sha1 = put(root, "lib.jar", b"data")
+
+    requests.get(f"{base}/{prefix}/lib.jar?_sha1={sha1}", timeout=10)
+    assert hits == ["/lib.jar"]
+
+
+def test_disallowed_host_is_refused(cache):
+    _, base = cache
+    assert requests.get(f"{base}/https/example.com/x.jar", timeout=10).status_code == 403
+    assert requests.get(f"{base}/file/127.0.0.1/etc/passwd", timeout=10).status_code == 403
+
+
+def test_install_engine_downloads_through_mirror(upstream, cache, tmp_path):
+    root, prefix, hits = upstream
+    server, base = cache
+    sha1 = put(root, "lib.jar", b"library")
+    engine = IbraMod.InstallEngine(manifests=None, max_workers=2)
+    engine.mirror = base
+
+    for n in range(2):  # two machines on the same LAN
+        job = {"url": f"{prefix.replace('/', '://', 1)}/lib.jar", "path": tmp_path / f"mc{n}" / "lib.jar", "sha1": sha1}
+        engine.fetch([job])
+        assert job["path"].read_bytes() == b"library"
+
+    assert hits == ["/lib.jar"]
+    assert server.stats == {"hits": 1, "misses": 1, "errors": 0, "evicted": 0}
@@ -0,0 +1,127 @@
+"""Modrinth retry/backoff, request coalescing and RateGovernor's AIMD rules, against a fake session."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+pytest.importorskip("customtkinter")
+pytest.importorskip("minecraft_launcher_lib")
+import IbraMod  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, status, data=None, headers=None):
+        self.status_code = status
+        self.ok = 200 <= status < 300
+        self.headers = headers or {}
+        self.text = ""
+        self.data = data
+
+    def json(self): return self.data
+
+
+class FakeSession:
+    """Plays back a script of responses (or exceptions to raise), one per request."""
+    def __init__(self, *script, gate=None):
+        self.script = list(script)
+        self.calls = 0
+        self.gate = gate
+
+    def request(self, method, url, params=None, json=None, timeout=None):
+        self.calls += 1
+        if self.gate: self.gate.wait(5)
+        step = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if isinstance(step, Exception): raise step
+        return step
+
+
+@pytest.fixture
+def client():
+    m = IbraMod.Modrinth()
+    m.BACKOFF_BASE = 0      # no real sleeping between retries
+    return m
+
+
+def test_429_is_retried_and_halves_concurrency(client):
+    start = client.governor.concurrency
+    client.session = FakeSession(FakeResponse(429, headers={"Retry-After": "0"}), FakeResponse(200, {"id": "x"}))
+    assert client._request("GET", "/project/x") == {"id": "x"}
+    s = client.get_stats()
+    assert (s["requests"], s["retries"], s["throttled"], s["ok"], s["failed"]) == (2, 1, 1, 1, 1)
+    assert s["status"] == {"429": 1, "200": 1}
+    assert s["concurrency"] == start // 2
+
+
+def test_timeouts_are_retried_then_raised(client):
+    client.session = FakeSession(requests.Timeout())
+    with pytest.raises(IbraMod.ModrinthTimeout):
+        client._request("GET", "/project/x")
+    assert client.session.calls == client.MAX_RETRIES + 1
+    assert client.stats["retries"] == client.MAX_RETRIES and client.stats["status"] == {"error": client.MAX_RETRIES + 1}
+
+
+def test_connection_error_then_success(client):
+    client.session = FakeSession(requests.ConnectionError(), FakeResponse(500), FakeResponse(200, []))
+    assert client._request("GET", "/search") == []
+    assert client.stats["retries"] == 2 and client.stats["failed"] == 2
+
+
+def test_404_and_4xx_are_not_retried(client):
+    client.session = FakeSession(FakeResponse(404))
+    assert client._request("GET", "/project/missing") is None
+    client.session = FakeSession(FakeResponse(400))
+    with pytest.raises(IbraMod.ModrinthHTTPError) as e:
+        client._request("GET", "/project/bad")
+    assert e.value.status == 400 and client.session.calls == 1
+
+
+def test_identical_calls_are_coalesced(client):
+    gate = threading.Event()
+    client.session = FakeSession(FakeResponse(200, {"hits": [1]}), gate=gate)
+    with ThreadPoolExecutor(5) as pool:
+        futures = [pool.submit(client._request, "GET", "/search", {"query": "sodium"}) for _ in range(5)]
+        while client.stats["coalesced"] < 4: time.sleep(0.01)
+        gate.set()
+        results = [f.result() for f in futures]
+    assert results == [{"hits": [1]}] * 5
+    assert client.session.calls == 1 and client.stats["coalesced"] == 4
+    assert client.pending == {}
+
+
+def test_governor_grows_only_on_ok_responses():
+    g = IbraMod.RateGovernor(max_concurrency=8)
+    start = g.concurrency
+    for _ in range(start * 4 * 3):
+        g.acquire()
+        g.release()             # transport error: no response at all
+    assert g.concurrency == start
+    for _ in range(start * 4):
+        g.acquire()
+        g.release(ok=True)
+    assert g.concurrency == start + 1
+
+
+def test_governor_error_resets_success_streak():
+    g = IbraMod.RateGovernor(max_concurrency=8)
+    start = g.concurrency
+    for i in range(start * 4):
+        g.acquire()
+        g.release(ok=i != start * 4 - 1)
+    assert g.concurrency == start and g.successes == 0
+
+
+def test_governor_throttle_and_headers():
+    g = IbraMod.RateGovernor(limit=300, max_concurrency=8)
+    g.acquire()
+    g.release(throttled=True, retry_after=5)
+    assert g.concurrency == 2 and g.blocked_until > time.monotonic() + 4
+
+    g = IbraMod.RateGovernor(limit=300)
+    g.acquire()
+    g.release({"X-Ratelimit-Limit": "10", "X-Ratelimit-Remaining": "3", "X-Ratelimit-Reset": "7"}, ok=True)
+    assert g.limit == 10 and g.tokens <= 3 and g.blocked_until == 0.0
+    g.acquire()
+    g.release({"X-Ratelimit-Limit": "10", "X-Ratelimit-Remaining": "0", "X-Ratelimit-Reset": "7"}, ok=True)
+    assert g.blocked_until > time.monotonic() + 6